@@ -1,15 +1,15 @@
 #!/usr/bin/env python3
 """Data structures for representing bridges and tunnels (brunnels)."""
 
-from typing import Optional, List, Dict, Any, Set, NamedTuple, Tuple
+from typing import Optional, List, Dict, Any, Set, NamedTuple, Sequence, Tuple
 from collections import defaultdict, deque
 from enum import Enum
 import logging
-from shapely import Point
 from shapely.geometry import LineString
-from shapely.ops import substring
+import numpy as np
 import pyproj
 import math
+import shapely
 
 from .geometry import (
     Position,
@@ -53,26 +53,29 @@ class Brunnel:
 
     def __init__(
         self,
-        coords: List[Position],
+        coords: Sequence[Position],
         metadata: Dict[str, Any],
         brunnel_type: BrunnelType,
         exclusion_reason: ExclusionReason = ExclusionReason.NONE,
         route_span: Optional[RouteSpan] = None,
         compound_group: Optional[List["Brunnel"]] = None,
-        overlap_group: Optional[List["Brunnel"]] = None,
+        overlap_group: Optional[Tuple["Brunnel", ...]] = None,
         projection: Optional[pyproj.Proj] = None,
+        linestring: Optional[LineString] = None,
     ):
         """Initializes a Brunnel object.
 
         Args:
-            coords: A list of Position objects representing the brunnel's geometry.
+            coords: A sequence of Position objects representing the brunnel's geometry.
             metadata: A dictionary containing metadata from OpenStreetMap.
             brunnel_type: The type of the brunnel (BRIDGE or TUNNEL).
             exclusion_reason: The reason why this brunnel might be excluded.
             route_span: A RouteSpan object indicating where the brunnel intersects with a route.
             compound_group: A list of other Brunnel objects if this is part of a compound structure.
-            overlap_group: A list of other Brunnel objects if this overlaps with other brunnels.
+            overlap_group: A tuple of Brunnel objects if this overlaps with other brunnels.
             projection: A pyproj.Proj object for coordinate transformations.
+            linestring: The brunnel's geometry, already transformed with projection.
+                If None, it is built from coords.
 
         Raises:
             ValueError: If coords is empty or has insufficient coordinates.
@@ -83,6 +86,7 @@ class Brunnel:
         self.exclusion_reason = exclusion_reason
         self.route_span = route_span
         self.compound_group = compound_group
+        self.compound_index: Optional[int] = None
         self.overlap_group = overlap_group
         self.projection = projection
         if not coords:
@@ -91,8 +95,13 @@ class Brunnel:
             raise ValueError(
                 f"{self.get_short_description()} has insufficient coordinates"
             )
-        coord_tuples = [(pos.longitude, pos.latitude) for pos in self.coords]
-        self.linestring: LineString = coords_to_polyline(coord_tuples, self.projection)
+        if linestring is None:
+            coord_tuples = [(pos.longitude, pos.latitude) for pos in self.coords]
+            linestring = coords_to_polyline(coord_tuples, self.projection)
+        self.linestring: LineString = linestring
+        # Popup HTML for the tags and other metadata, memoized by the map
+        # builder; it depends only on metadata, which never changes after loading
+        self.metadata_html: Optional[str] = None
 
     def is_representative(self) -> bool:
         """
@@ -104,10 +113,23 @@ class Brunnel:
         Returns:
             bool: True if this brunnel is representative, False otherwise.
         """
+        return self.get_compound_index() == 0
+
+    def get_compound_index(self) -> int:
+        """
+        Get this brunnel's position in its compound group.
+
+        The position is recorded when the compound group is marked; otherwise it
+        is looked up once and memoized.
+
+        Returns:
+            int: Index of this brunnel in compound_group, or 0 if it has no group.
+        """
         if self.compound_group is None:
-            return True
-        compound_group = self.compound_group
-        return compound_group.index(self) == 0
+            return 0
+        if self.compound_index is None:
+            self.compound_index = self.compound_group.index(self)
+        return self.compound_index
 
     def get_id(self) -> str:
         """Get a string identifier for this brunnel.
@@ -221,108 +243,6 @@ class Brunnel:
             and other.route_span.start_distance <= self.route_span.end_distance
         )
 
-    def is_contained_by(self, route_geometry) -> bool:
-        """
-        Check if this brunnel is completely contained within a route geometry.
-
-        Args:
-            route_geometry: Shapely geometry object representing the buffered route polygon
-
-        Returns:
-            True if the route geometry completely contains this brunnel, False otherwise
-        """
-
-        return route_geometry.contains(self.linestring)
-
-    def calculate_route_span(self, route) -> None:
-        """
-        Calculate the span of this brunnel along the route.
-
-        Args:
-            route: Route object representing the route
-        """
-        min_distance = float("inf")
-        max_distance = -float("inf")
-
-        points = [Point(coord) for coord in self.linestring.coords]
-        # Find the closest route point for each brunnel coordinate
-        for point in points:
-            distance = route.linestring.project(point)  # Keep in meters
-
-            min_distance = min(min_distance, distance)
-            max_distance = max(max_distance, distance)
-
-        self.route_span = RouteSpan(min_distance, max_distance)
-
-    def is_aligned_with_route(self, route, tolerance_degrees: float) -> bool:
-        """
-        Check if this brunnel's bearing is aligned with the route within tolerance.
-
-        For each brunnel segment, projects endpoints onto the route to find the
-        corresponding route substring, then checks alignment between each brunnel
-        segment and each route segment in that substring. Returns True if any
-        segment pair is within tolerance.
-
-        Args:
-            route: Route object representing the route
-            tolerance_degrees: Allowed bearing deviation in degrees
-
-        Returns:
-            True if any brunnel segment is aligned with any route segment within tolerance
-        """
-        cos_max_angle = math.cos(math.radians(tolerance_degrees))
-        brunnel_coords = list(self.linestring.coords)
-
-        # Check each brunnel segment
-        for b_idx in range(len(brunnel_coords) - 1):
-            # Get brunnel segment endpoints
-            b_start_point = Point(brunnel_coords[b_idx])
-            b_end_point = Point(brunnel_coords[b_idx + 1])
-
-            # Project brunnel endpoints onto route to get distances
-            d1 = route.linestring.project(b_start_point)
-            d2 = route.linestring.project(b_end_point)
-
-            route_substring = substring(route.linestring, d1, d2)
-            if route_substring.is_empty:
-                continue
-            route_coords = list(route_substring.coords)
-
-            # Get brunnel segment vector
-            b_vec_x = brunnel_coords[b_idx + 1][0] - brunnel_coords[b_idx][0]
-            b_vec_y = brunnel_coords[b_idx + 1][1] - brunnel_coords[b_idx][1]
-            b_mag = math.sqrt(b_vec_x**2 + b_vec_y**2)
-
-            if b_mag == 0:
-                continue  # Skip zero-length brunnel segment
-
-            # Check alignment with each route segment in the substring
-            for r_idx in range(len(route_coords) - 1):
-                # Get route segment vector
-                r_vec_x = route_coords[r_idx + 1][0] - route_coords[r_idx][0]
-                r_vec_y = route_coords[r_idx + 1][1] - route_coords[r_idx][1]
-                r_mag = math.sqrt(r_vec_x**2 + r_vec_y**2)
-
-                if r_mag == 0:
-                    continue  # Skip zero-length route segment
-
-                # Calculate alignment using dot product
-                # abs() handles both parallel and anti-parallel cases
-                dot_product = abs(
-                    (b_vec_x * r_vec_x + b_vec_y * r_vec_y) / (b_mag * r_mag)
-                )
-
-                # Ensure dot_product is not slightly > 1.0 due to precision errors
-                dot_product = min(dot_product, 1.0)
-
-                # If this segment pair is aligned within tolerance, return True
-                if dot_product >= cos_max_angle:
-                    return True
-
-        # No segment pairs were aligned within tolerance
-        logger.debug(f"{self.get_short_description()} is not aligned with the route")
-        return False
-
     @classmethod
     def from_overpass_data(
         cls,
@@ -341,19 +261,125 @@ class Brunnel:
         Returns:
             Brunnel object
         """
-        # Extract coordinates from geometry
-        coords = []
-        if "geometry" in way_data:
-            for node in way_data["geometry"]:
-                coords.append(Position(latitude=node["lat"], longitude=node["lon"]))
-
         return cls(
-            coords=coords,
+            coords=cls.coords_from_overpass_data(way_data),
             metadata=way_data,
             brunnel_type=brunnel_type,
             projection=projection,
         )
 
+    @staticmethod
+    def coords_from_overpass_data(way_data: Dict[str, Any]) -> List[Position]:
+        """
+        Extract the coordinates of a single way from Overpass response.
+
+        Args:
+            way_data: Raw way data from Overpass API
+
+        Returns:
+            List of Position objects for the way's nodes (empty if the way has
+            no geometry)
+        """
+        coords = []
+        if "geometry" in way_data:
+            for node in way_data["geometry"]:
+                coords.append(Position(latitude=node["lat"], longitude=node["lon"]))
+        return coords
+
+
+def find_aligned_brunnels(
+    brunnels: List[Brunnel], route, tolerance_degrees: float
+) -> np.ndarray:
+    """
+    Check which brunnels are aligned with the route within tolerance.
+
+    All brunnel points are projected onto the route in one call. Each brunnel
+    segment is paired with every route segment in the range its endpoints
+    project onto, and the alignment of all pairs is checked in bulk, so there is
+    no Python loop over brunnels or segments.
+
+    Args:
+        brunnels: Brunnels to check
+        route: Route object representing the route
+        tolerance_degrees: Allowed bearing deviation in degrees
+
+    Returns:
+        Boolean array, True where some segment of the brunnel is aligned with a
+        route segment within tolerance
+    """
+    aligned = np.zeros(len(brunnels), dtype=bool)
+    if not brunnels:
+        return aligned
+
+    cos_max_angle = math.cos(math.radians(tolerance_degrees))
+    # Signed square, so tolerances beyond 90 degrees still accept every angle
+    cos_max_angle_sq = math.copysign(cos_max_angle * cos_max_angle, cos_max_angle)
+    cumulative_distances, route_directions = route.get_segment_geometry()
+    last_segment = len(route_directions) - 1
+
+    # Concatenate all brunnel points and project them onto the route at once
+    linestrings = [brunnel.linestring for brunnel in brunnels]
+    point_counts = shapely.get_num_coordinates(linestrings)
+    coords = shapely.get_coordinates(linestrings)
+    distances = route.locate_points(coords)
+
+    # Brunnel segments join consecutive points of the same brunnel
+    is_segment_start = np.ones(len(coords), dtype=bool)
+    is_segment_start[np.cumsum(point_counts) - 1] = False
+    segment_starts = np.flatnonzero(is_segment_start)
+    segment_owners = np.repeat(np.arange(len(brunnels)), point_counts - 1)
+
+    # Route segments covering each brunnel segment's projected extent, from the
+    # one containing its start point through the one containing its end point
+    d1 = distances[segment_starts]
+    d2 = distances[segment_starts + 1]
+    start_distances = np.minimum(d1, d2)
+    end_distances = np.maximum(d1, d2)
+    first_segments = np.maximum(
+        np.searchsorted(cumulative_distances, start_distances, "right") - 1, 0
+    )
+    last_segments = np.minimum(
+        np.searchsorted(cumulative_distances, end_distances, "left") - 1,
+        last_segment,
+    )
+
+    # Get brunnel segment vectors
+    b_vectors = coords[segment_starts + 1] - coords[segment_starts]
+    b_mags_sq = b_vectors[:, 0] ** 2 + b_vectors[:, 1] ** 2
+
+    # Skip brunnel segments whose endpoints project to the same route point,
+    # and zero-length brunnel segments
+    candidates = np.flatnonzero((start_distances != end_distances) & (b_mags_sq != 0))
+    range_lengths = np.maximum(
+        last_segments[candidates] - first_segments[candidates] + 1, 0
+    )
+
+    # Expand to one (brunnel segment, route segment) pair per route segment in
+    # each candidate's range
+    pair_segments = np.repeat(candidates, range_lengths)
+    range_offsets = np.arange(len(pair_segments)) - np.repeat(
+        np.cumsum(range_lengths) - range_lengths, range_lengths
+    )
+    pair_route_segments = np.repeat(first_segments[candidates], range_lengths)
+    pair_route_segments += range_offsets
+    directions = route_directions[pair_route_segments]
+
+    # Compare squared dot products with the unit route directions against
+    # cos²·|b|², which needs no square root or division; squaring handles
+    # both parallel and anti-parallel cases, and zero-length route segments
+    # have NaN directions and never compare as aligned
+    dot_products = (
+        directions[:, 0] * b_vectors[pair_segments, 0]
+        + directions[:, 1] * b_vectors[pair_segments, 1]
+    )
+    within_tolerance = (
+        dot_products * dot_products >= cos_max_angle_sq * b_mags_sq[pair_segments]
+    )
+
+    # A brunnel is aligned if any of its segment pairs is within tolerance
+    aligned[segment_owners[pair_segments[within_tolerance]]] = True
+    return aligned
+
 
 def _build_node_edges(
     brunnels: Dict[str, Brunnel],
@@ -435,21 +461,23 @@ def _mark_compound_groups(
     connected_components: List[Set[str]], brunnels: Dict[str, Brunnel]
 ) -> None:
     """Mark compound groups for components with more than one way."""
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
     for component in connected_components:
         # Only mark components with more than one way as compound groups
         if len(component) > 1:
             # Add compound_group to all brunnels in this component
-            logger.debug(
-                f"Marking compound group with {len(component)} ways: {', '.join(component)}"
-            )
+            if debug_enabled:
+                logger.debug(
+                    f"Marking compound group with {len(component)} ways: {', '.join(component)}"
+                )
             compound_group = [brunnels[way_id] for way_id in component]
             # Sort by start distance for consistent ordering
             compound_group.sort(
                 key=lambda b: b.route_span.start_distance if b.route_span else 0.0
             )
-            for way_id in component:
-                brunnel = brunnels[way_id]
+            for index, brunnel in enumerate(compound_group):
                 brunnel.compound_group = compound_group
+                brunnel.compound_index = index
 
 
 def find_compound_brunnels(brunnels: Dict[str, Brunnel]) -> None:
@@ -16,11 +16,9 @@ import logging
 import sys
 import os
 from gpxpy import gpx
-from shapely.geometry.base import BaseGeometry
 
 
 from . import __version__
-from . import visualization
 from .metrics import collect_metrics, log_metrics
 from .route import Route
 from .brunnel import (
@@ -94,6 +92,16 @@ def create_argument_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Don't automatically open the HTML file in browser",
     )
+    parser.add_argument(
+        "--minimal-popups",
+        action="store_true",
+        help="Show only name and OSM ID in map popups of excluded brunnels",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't read or write the parsed GPX route cache",
+    )
     parser.add_argument(
         "--metrics",
         action="store_true",
@@ -285,7 +293,7 @@ def log_nearby_brunnels(brunnels: Dict[str, Brunnel]) -> None:
         indent = "" if brunnel.overlap_group is None else "  "
         if (
             current_overlap_group is not None or brunnel.overlap_group is not None
-        ) and current_overlap_group != brunnel.overlap_group:
+        ) and current_overlap_group is not brunnel.overlap_group:
             current_overlap_group = brunnel.overlap_group
             if current_overlap_group is not None:
                 print("--- Overlapping ---" + "-" * (len(span_info) - 20))
@@ -298,22 +306,29 @@ def log_nearby_brunnels(brunnels: Dict[str, Brunnel]) -> None:
 
 
 def exclude_uncontained_brunnels(
-    route_geometry: BaseGeometry, brunnels: Dict[str, Brunnel]
+    route: Route, route_buffer: float, brunnels: Dict[str, Brunnel]
 ) -> None:
     """
-    Excludes brunnels that are not contained within the given route geometry.
+    Excludes brunnels that are not contained within the buffered route.
 
     Args:
-        route_geometry: The Shapely geometry of the (buffered) route.
+        route: The route to test brunnels against.
+        route_buffer: Buffer distance around the route in meters.
         brunnels: A dictionary of Brunnel objects to check.
 
     """
 
-    for brunnel in brunnels.values():
-        if (
-            brunnel.exclusion_reason == ExclusionReason.NONE
-            and not brunnel.is_contained_by(route_geometry)
-        ):
+    candidates = [
+        brunnel
+        for brunnel in brunnels.values()
+        if brunnel.exclusion_reason == ExclusionReason.NONE
+    ]
+    if not candidates:
+        return
+
+    contained = route.brunnels_within_buffer(candidates, route_buffer)
+    for brunnel, is_contained in zip(candidates, contained):
+        if not is_contained:
             brunnel.exclusion_reason = ExclusionReason.OUTLIER
 
 
@@ -358,12 +373,13 @@ def _parse_and_validate_args() -> argparse.Namespace:
     return args
 
 
-def _load_route(filename: str) -> Route:
+def _load_route(filename: str, use_cache: bool = True) -> Route:
     """
     Load and parse the GPX file into a Route object.
 
     Args:
         filename: Path to the GPX file
+        use_cache: Whether to use the parsed-route cache
 
     Returns:
         Route object created from GPX file
@@ -372,19 +388,22 @@ def _load_route(filename: str) -> Route:
         On file loading or parsing errors
     """
     try:
-        route = Route.from_file(filename)
+        route = Route.from_file(filename, use_cache=use_cache)
     except FileNotFoundError:
         logger.error(f"GPX file not found: {filename}")
         sys.exit(1)
     except PermissionError:
         logger.error(f"Cannot read GPX file (permission denied): {filename}")
         sys.exit(1)
+    except UnicodeDecodeError as e:
+        logger.error(f"Cannot read GPX file (not valid UTF-8): {filename}: {e}")
+        sys.exit(1)
     except gpx.GPXException as e:
         logger.error(f"Invalid GPX file: {e}")
         sys.exit(1)
 
     logger.info(f"Loaded GPX route with {len(route)} points")
-    logger.info(f"Total route distance: {route.linestring.length / 1000:.2f} km")
+    logger.info(f"Total route distance: {route.length / 1000:.2f} km")
 
     return route
 
@@ -413,8 +432,7 @@ def _discover_and_filter_brunnels(
         logger.debug(f"{excluded_count} brunnels excluded (will show greyed out)")
 
     # Apply geometric filtering
-    route_geometry = route.calculate_buffered_route_geometry(args.route_buffer)
-    exclude_uncontained_brunnels(route_geometry, brunnels)
+    exclude_uncontained_brunnels(route, args.route_buffer, brunnels)
     route.calculate_route_spans(brunnels)
 
     # Exclude misaligned brunnels based on bearing tolerance
@@ -466,8 +484,11 @@ def _generate_output(
     # Collect metrics before creating map
     metrics = collect_metrics(brunnels)
 
-    # Create visualization map
+    # Create visualization map; folium is only imported when a map is made,
+    # so --no-map runs skip its sizable import time
     try:
+        from . import visualization
+
         visualization.create_route_map(route, output_filename, brunnels, metrics, args)
     except Exception as e:
         logger.error(f"Failed to create map: {e}")
@@ -500,7 +521,7 @@ def main():
             sys.exit(1)
 
     # Load route from GPX file
-    route = _load_route(args.filename)
+    route = _load_route(args.filename, use_cache=not args.no_cache)
 
     # Discover and filter brunnels
     brunnels = _discover_and_filter_brunnels(route, args)
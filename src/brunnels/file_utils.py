@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """
-Filename utilities for generating output filenames.
+File utilities for generating output filenames and caching parsed routes.
 """
 
+from typing import Optional, Tuple
+import hashlib
 import os
 import logging
+import tempfile
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -75,3 +79,133 @@ def generate_output_filename(input_filename: str) -> str:
         "Please clean up your output directory or specify --output explicitly."
     )
     raise RuntimeError("No available filename found after 180 attempts")
+
+
+# Bump when the cached route format changes, so stale entries are ignored
+ROUTE_CACHE_VERSION = 1
+
+# Maximum number of cached routes kept; least recently used entries are pruned
+ROUTE_CACHE_MAX_ENTRIES = 32
+
+
+def get_route_cache_path(input_filename: str) -> Optional[str]:
+    """
+    Get the cache file path for the parsed coordinates of a GPX file.
+
+    The cache key combines the file's absolute path, size and modification
+    time, so editing or replacing the file invalidates its entry. Cache files
+    live under $XDG_CACHE_HOME/brunnels (default ~/.cache/brunnels).
+
+    Args:
+        input_filename: Path to the input GPX file
+
+    Returns:
+        Path of the cache file, or None if the input file cannot be stat'ed
+    """
+    try:
+        stat = os.stat(input_filename)
+    except OSError:
+        return None
+
+    key = (
+        f"{ROUTE_CACHE_VERSION}:{os.path.abspath(input_filename)}:"
+        f"{stat.st_size}:{stat.st_mtime_ns}"
+    )
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "brunnels", "routes", f"{digest}.npz")
+
+
+def load_cached_coordinates(
+    cache_path: str,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Load cached route coordinates.
+
+    Args:
+        cache_path: Path returned by get_route_cache_path
+
+    Returns:
+        Tuple of (latitudes, longitudes) arrays, or None if there is no usable
+        cache entry
+    """
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            latitudes, longitudes = data["latitudes"], data["longitudes"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.debug(f"Ignoring unreadable route cache {cache_path}: {e}")
+        return None
+
+    # Refresh the modification time so pruning evicts least recently used entries
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return latitudes, longitudes
+
+
+def save_cached_coordinates(
+    cache_path: str, latitudes: np.ndarray, longitudes: np.ndarray
+) -> None:
+    """
+    Save route coordinates to the cache.
+
+    The file is written to a temporary name and renamed into place, so
+    concurrent runs never see a partial entry. Afterwards the cache directory
+    is pruned to ROUTE_CACHE_MAX_ENTRIES entries. Failures are logged and
+    otherwise ignored, since the cache is only an optimization.
+
+    Args:
+        cache_path: Path returned by get_route_cache_path
+        latitudes: Route latitudes in decimal degrees
+        longitudes: Route longitudes in decimal degrees
+    """
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, latitudes=latitudes, longitudes=longitudes)
+            os.replace(temp_path, cache_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as e:
+        logger.debug(f"Could not write route cache {cache_path}: {e}")
+        return
+
+    prune_route_cache(cache_dir)
+
+
+def prune_route_cache(
+    cache_dir: str, max_entries: int = ROUTE_CACHE_MAX_ENTRIES
+) -> None:
+    """
+    Remove the least recently used route cache entries beyond max_entries.
+
+    Args:
+        cache_dir: Directory holding the cached routes
+        max_entries: Number of most recently used entries to keep
+    """
+    try:
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".npz"):
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+    except OSError as e:
+        logger.debug(f"Could not list route cache {cache_dir}: {e}")
+        return
+
+    entries.sort(reverse=True)
+    for _, path in entries[max_entries:]:
+        try:
+            os.unlink(path)
+        except OSError as e:
+            logger.debug(f"Could not remove route cache entry {path}: {e}")
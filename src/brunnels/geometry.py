@@ -6,10 +6,24 @@ map projections (Transverse Mercator) and converting coordinate lists to
 Shapely LineString objects.
 """
 
-from typing import List, Optional, Tuple, NamedTuple
+from functools import lru_cache
+from typing import (
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    NamedTuple,
+    Union,
+    overload,
+)
 from shapely.geometry import LineString
+import shapely
+import numpy as np
 import pyproj
 
+EARTH_RADIUS_METERS = 6371000.0
+
 
 class Position(NamedTuple):
     """Represents a geographic position with latitude and longitude."""
@@ -18,12 +32,63 @@ class Position(NamedTuple):
     longitude: float
 
 
+class PositionArray(Sequence[Position]):
+    """
+    A read-only sequence of Positions stored as latitude and longitude arrays.
+
+    Positions are only materialized when they are indexed or iterated, so large
+    routes keep two contiguous float64 arrays instead of one tuple per point.
+    """
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray):
+        """Initializes a PositionArray.
+
+        Args:
+            latitudes: Latitudes in decimal degrees
+            longitudes: Longitudes in decimal degrees, same length as latitudes
+
+        Raises:
+            ValueError: If the arrays differ in length.
+        """
+        if len(latitudes) != len(longitudes):
+            raise ValueError("Latitude and longitude arrays must have equal length")
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    @overload
+    def __getitem__(self, index: int) -> Position: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[Position]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(
+                map(
+                    Position,
+                    self.latitudes[index].tolist(),
+                    self.longitudes[index].tolist(),
+                )
+            )
+        return Position(float(self.latitudes[index]), float(self.longitudes[index]))
+
+    def __iter__(self) -> Iterator[Position]:
+        return map(Position, self.latitudes.tolist(), self.longitudes.tolist())
+
+
+@lru_cache(maxsize=16)
 def create_transverse_mercator_projection(
     bbox: Tuple[float, float, float, float],
 ) -> pyproj.Proj:
     """
     Create a custom transverse mercator projection centered on the given bounding box.
 
+    Constructing a pyproj.Proj is expensive, so projections are cached by
+    bounding box and shared between routes with the same extent.
+
     Args:
         bbox: Tuple of (south, west, north, east) in decimal degrees
 
@@ -42,13 +107,15 @@ def create_transverse_mercator_projection(
 
 
 def coords_to_polyline(
-    coord_tuples: List[Tuple[float, float]], projection: Optional[pyproj.Proj] = None
+    coord_tuples: Union[Sequence[Tuple[float, float]], np.ndarray],
+    projection: Optional[pyproj.Proj] = None,
 ) -> LineString:
     """
-    Convert a list of coordinate tuples to a Shapely LineString.
+    Convert a sequence of coordinate pairs to a Shapely LineString.
 
     Args:
-        coord_tuples: List of (longitude, latitude) tuples
+        coord_tuples: Sequence of (longitude, latitude) tuples, or an (N, 2)
+                      array of longitude/latitude columns
         projection: Optional pyproj.Proj object for coordinate transformation.
                    If None, uses lat/lon coordinates directly.
 
@@ -59,16 +126,93 @@ def coords_to_polyline(
     Raises:
         ValueError: If coord_tuples is empty or has less than 2 points
     """
-    if not coord_tuples or len(coord_tuples) < 2:
+    if len(coord_tuples) < 2:
         raise ValueError("At least two positions are required to create a LineString.")
 
     if projection is not None:
-        # Transform to projected coordinates (x, y)
-        lons = [pos[0] for pos in coord_tuples]
-        lats = [pos[1] for pos in coord_tuples]
-        x_coords, y_coords = projection(lons, lats)
-        projected_coords = list(zip(x_coords, y_coords))
-        return LineString(projected_coords)
+        # Transform to projected coordinates (x, y) in a single array call
+        coord_array = np.asarray(coord_tuples, dtype=np.float64)
+        x_coords, y_coords = projection(coord_array[:, 0], coord_array[:, 1])
+        return LineString(np.column_stack((x_coords, y_coords)))
 
     # If no projection, use coordinates as is (assumed to be in lat/lon)
     return LineString(coord_tuples)
+
+
+def coords_to_polylines(
+    coords: PositionArray,
+    counts: Sequence[int],
+    projection: Optional[pyproj.Proj] = None,
+) -> List[LineString]:
+    """
+    Convert consecutive runs of positions to Shapely LineStrings at once.
+
+    All positions are transformed with a single projection call, then split
+    into one LineString per run.
+
+    Args:
+        coords: Positions of all runs, one run after another
+        counts: Number of positions in each run, each at least two
+        projection: Optional pyproj.Proj object for coordinate transformation.
+                   If None, uses lat/lon coordinates directly.
+
+    Returns:
+        List of LineString objects, one per run, in projected coordinates if
+        projection is provided, otherwise in geographic coordinates
+
+    Raises:
+        ValueError: If any run has less than 2 points
+    """
+    if len(counts) == 0:
+        return []
+    if min(counts) < 2:
+        raise ValueError("At least two positions are required to create a LineString.")
+
+    x_coords = coords.longitudes
+    y_coords = coords.latitudes
+    if projection is not None:
+        x_coords, y_coords = projection(x_coords, y_coords)
+
+    linestrings = shapely.linestrings(
+        np.column_stack((x_coords, y_coords)),
+        indices=np.repeat(np.arange(len(counts)), counts),
+    )
+    return list(linestrings)  # type: ignore[arg-type]
+
+
+def haversine_distances(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """
+    Calculate great-circle distances between consecutive points of a polyline.
+
+    Args:
+        latitudes: Array of latitudes in decimal degrees
+        longitudes: Array of longitudes in decimal degrees
+
+    Returns:
+        Array of length N-1 with the distance in meters from each point to the next
+    """
+    lat_radians = np.radians(latitudes)
+    lon_radians = np.radians(longitudes)
+
+    # Each point's cosine is shared by the segments on either side of it
+    cos_lat = np.cos(lat_radians)
+
+    # Evaluate the formula in place so that long routes only allocate a
+    # couple of route-sized buffers instead of one per intermediate term
+    a = np.diff(lat_radians)
+    a *= 0.5
+    np.sin(a, out=a)
+    a *= a
+
+    b = np.diff(lon_radians)
+    b *= 0.5
+    np.sin(b, out=b)
+    b *= b
+    b *= cos_lat[:-1]
+    b *= cos_lat[1:]
+
+    a += b
+    np.sqrt(a, out=a)
+    np.arcsin(a, out=a)
+    a *= 2 * EARTH_RADIUS_METERS
+    return a
@@ -3,35 +3,63 @@
 Route data model for brunnel analysis.
 """
 
-from typing import Tuple, List, TextIO, Dict
+from typing import Tuple, List, TextIO, Dict, Optional, Sequence
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import math
 from math import cos, radians
 import argparse
-import gpxpy
+from xml.etree import ElementTree
 import gpxpy.gpx
-from shapely.geometry.base import BaseGeometry
-from shapely.geometry import LineString, Point
-
-from .brunnel import Brunnel, BrunnelType, ExclusionReason
+import numpy as np
+import shapely
+from shapely.geometry import LineString, MultiLineString
+
+from .brunnel import (
+    Brunnel,
+    BrunnelType,
+    ExclusionReason,
+    RouteSpan,
+    find_aligned_brunnels,
+)
 from .overpass import query_overpass_brunnels
 from .geometry import (
     Position,
+    PositionArray,
     coords_to_polyline,
+    coords_to_polylines,
     create_transverse_mercator_projection,
+    haversine_distances,
+)
+from .file_utils import (
+    get_route_cache_path,
+    load_cached_coordinates,
+    save_cached_coordinates,
 )
 
 logger = logging.getLogger(__name__)
 
+# Approximate meters per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = 111000.0
+
+# Initial number of route points scanned at a time when finding query chunk ends
+CHUNK_SCAN_WINDOW = 1024
+
+# Maximum number of chunked Overpass queries in flight at once; the public
+# Overpass API allows each client only a couple of concurrent query slots
+MAX_CONCURRENT_QUERIES = 2
+
 
 class Route:
     """Represents a GPX route with memoized geometric operations."""
 
-    def __init__(self, coords: List[Position]):
+    def __init__(self, coords: Sequence[Position]):
         """Initializes a Route object.
 
         Args:
-            coords: A list of Position objects representing the route's geometry.
+            coords: A sequence of Position objects representing the route's
+                geometry; a PositionArray is used without copying.
 
         Raises:
             ValueError: If coords is empty or has fewer than two coordinates.
@@ -41,36 +69,80 @@ class Route:
         if len(coords) < 2:
             raise ValueError("Route must have at least two coordinates")
 
+        self.coords = coords
+
+        # Structure-of-arrays copies of the coordinates for vectorized operations
+        self.latitudes: np.ndarray
+        self.longitudes: np.ndarray
+        if isinstance(coords, PositionArray):
+            self.latitudes = coords.latitudes
+            self.longitudes = coords.longitudes
+        else:
+            coord_array = np.asarray(coords, dtype=np.float64)
+            self.latitudes = np.ascontiguousarray(coord_array[:, 0])
+            self.longitudes = np.ascontiguousarray(coord_array[:, 1])
+
         # Check for polar proximity (within 5 degrees of poles)
-        for i, coord in enumerate(coords):
-            if abs(coord.latitude) > 85.0:
-                raise RuntimeError(
-                    f"Route point {i} at latitude {coord.latitude:.3f}° is within "
-                    f"5 degrees of a pole"
-                )
+        near_pole = np.abs(self.latitudes) > 85.0
+        if near_pole.any():
+            i = int(np.argmax(near_pole))
+            raise RuntimeError(
+                f"Route point {i} at latitude {self.latitudes[i]:.3f}° is within "
+                f"5 degrees of a pole"
+            )
 
         # Check for antimeridian crossing
-        for i in range(1, len(coords)):
-            lon_diff = abs(coords[i].longitude - coords[i - 1].longitude)
-            if lon_diff > 180.0:
-                raise RuntimeError(
-                    f"Route crosses antimeridian between points {i-1} and {i} "
-                    f"(longitude jump: {lon_diff:.3f}°)"
-                )
+        lon_diffs = np.abs(np.diff(self.longitudes))
+        crossings = lon_diffs > 180.0
+        if crossings.any():
+            i = int(np.argmax(crossings)) + 1
+            raise RuntimeError(
+                f"Route crosses antimeridian between points {i-1} and {i} "
+                f"(longitude jump: {lon_diffs[i - 1]:.3f}°)"
+            )
 
-        self.coords = coords
         self.bbox = self._calculate_bbox()
 
+        # Meters per degree of longitude at the middle latitude of the bounding box,
+        # used to convert buffer distances to degrees
+        south, _, north, _ = self.bbox
+        self._meters_per_degree_lon = METERS_PER_DEGREE * abs(
+            cos(radians((south + north) / 2))
+        )
+
         # Create projection based on route bounding box
         self.projection = create_transverse_mercator_projection(self.bbox)
 
-        coord_tuples = [(pos.longitude, pos.latitude) for pos in self.coords]
-        self.linestring: LineString = coords_to_polyline(coord_tuples, self.projection)
+        self.linestring: LineString = coords_to_polyline(
+            np.column_stack((self.longitudes, self.latitudes)), self.projection
+        )
+
+        # Projected (x, y) coordinates and total length in meters, extracted once
+        # from the linestring so later passes avoid repeated GEOS calls
+        self.projected_coords: np.ndarray = shapely.get_coordinates(self.linestring)
+        self.length: float = float(self.linestring.length)
+
+        # Memoized average brunnel distances, keyed by brunnel ID
+        self._avg_distance_cache: Dict[str, float] = {}
+
+        # Spatial index over route segments, built on first use
+        self._segment_tree: Optional[shapely.STRtree] = None
+
+        # Cumulative haversine distances along the route, computed on first use
+        self._track_distances: Optional[np.ndarray] = None
+
+        # Cumulative distances and unit direction vectors of route segments,
+        # computed on first use
+        self._segment_geometry: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        # Buffered bounding boxes, keyed by buffer distance in meters
+        self._buffered_bboxes: Dict[float, Tuple[float, float, float, float]] = {}
 
     def get_bbox(self, buffer: float = 0.0) -> Tuple[float, float, float, float]:
         """
         Get bounding box for this route, optionally with a buffer.
-        The internally stored _bbox is always without a buffer.
+        The internally stored bbox is always without a buffer; buffered
+        bounding boxes are memoized per buffer distance.
 
         Args:
             buffer: Buffer distance in meters (default: 0.0)
@@ -79,24 +151,22 @@ class Route:
             Tuple of (south, west, north, east) in decimal degrees
 
         """
-
-        # Ensure the base bounding box (0 buffer) is calculated and memoized
-        if self.bbox is None:
-            self.bbox = self._calculate_bbox()
-
         # If no buffer is requested, return the memoized base bounding box
         if buffer == 0.0:
             return self.bbox
 
+        cached = self._buffered_bboxes.get(buffer)
+        if cached is not None:
+            return cached
+
         # If a buffer is requested, calculate it based on the memoized _bbox
         min_lat, min_lon, max_lat, max_lon = self.bbox
 
         # Convert buffer from m to approximate degrees
-        # 1 degree latitude ≈ 111 km = 111000m
-        # longitude varies by latitude, use average of the base bbox
-        avg_lat = (min_lat + max_lat) / 2
-        lat_buffer = buffer / 111000.0
-        lon_buffer = buffer / (111000.0 * abs(cos(radians(avg_lat))))
+        # longitude varies by latitude, so use the precomputed scale at the
+        # average latitude of the base bbox
+        lat_buffer = buffer / METERS_PER_DEGREE
+        lon_buffer = buffer / self._meters_per_degree_lon
 
         # Apply buffer (ensure we don't exceed valid coordinate ranges)
         buffered_south = max(-90.0, min_lat - lat_buffer)
@@ -105,9 +175,11 @@ class Route:
         buffered_east = min(180.0, max_lon + lon_buffer)
 
         logger.debug(
-            f"Returning on-the-fly buffered bounding box: ({buffered_south:.4f}, {buffered_west:.4f}, {buffered_north:.4f}, {buffered_east:.4f}) with {buffer}m buffer from base _bbox"
+            f"Calculated buffered bounding box: ({buffered_south:.4f}, {buffered_west:.4f}, {buffered_north:.4f}, {buffered_east:.4f}) with {buffer}m buffer from base bbox"
         )
-        return (buffered_south, buffered_west, buffered_north, buffered_east)
+        buffered_bbox = (buffered_south, buffered_west, buffered_north, buffered_east)
+        self._buffered_bboxes[buffer] = buffered_bbox
+        return buffered_bbox
 
     def _calculate_bbox(self) -> Tuple[float, float, float, float]:
         """
@@ -121,26 +193,13 @@ class Route:
             A tuple (south, west, north, east) representing the bounding box
             in decimal degrees, with no buffer applied.
         """
-        latitudes = [coord.latitude for coord in self.coords]
-        longitudes = [coord.longitude for coord in self.coords]
-
-        min_lat, max_lat = min(latitudes), max(latitudes)
-        min_lon, max_lon = min(longitudes), max(longitudes)
-
-        # Buffer is always 0 for the base calculation.
-        # The actual `buffer` parameter passed to this method is ignored.
-        internal_buffer_value = 0.0
-        lat_buffer = 0.0  # Since internal_buffer_value is 0
-        lon_buffer = 0.0  # Since internal_buffer_value is 0
-
-        # Apply 0 buffer (effectively just taking min/max values)
-        south = max(-90.0, min_lat - lat_buffer)
-        north = min(90.0, max_lat + lat_buffer)
-        west = max(-180.0, min_lon - lon_buffer)
-        east = min(180.0, max_lon + lon_buffer)
+        south = float(self.latitudes.min())
+        north = float(self.latitudes.max())
+        west = float(self.longitudes.min())
+        east = float(self.longitudes.max())
 
         logger.debug(
-            f"Base route bounding box calculated: ({south:.4f}, {west:.4f}, {north:.4f}, {east:.4f}) with {internal_buffer_value}m buffer"
+            f"Base route bounding box calculated: ({south:.4f}, {west:.4f}, {north:.4f}, {east:.4f})"
         )
 
         return (south, west, north, east)
@@ -162,29 +221,42 @@ class Route:
     @staticmethod
     def _find_overlap_groups(nearby_brunnels: List[Brunnel]) -> List[List[Brunnel]]:
         """Find groups of overlapping brunnels from pre-sorted list."""
+        # Pull the span endpoints and types into flat lists up front so the sweep
+        # below compares plain floats rather than chasing attributes.  Brunnels
+        # without a route span never join a group: their start is +inf and their
+        # end is -inf.
+        types = [brunnel.brunnel_type for brunnel in nearby_brunnels]
+        starts = [
+            b.route_span.start_distance if b.route_span is not None else math.inf
+            for b in nearby_brunnels
+        ]
+        ends = [
+            b.route_span.end_distance if b.route_span is not None else -math.inf
+            for b in nearby_brunnels
+        ]
+
         overlap_groups = []
+        count = len(nearby_brunnels)
         i = 0
 
-        while i < len(nearby_brunnels):
-            current_group = [nearby_brunnels[i]]
+        while i < count:
+            # Sweep the contiguous overlapping brunnels.  Since spans are sorted by
+            # start distance and a group only ever holds one brunnel type, a
+            # candidate overlaps some member exactly when it has the group's type
+            # and starts no later than the furthest end reached so far.
+            group_type = types[i]
+            group_end = ends[i]
             j = i + 1
-
-            # Find all contiguous overlapping brunnels
-            while j < len(nearby_brunnels):
-                if any(
-                    brunnel_in_group.overlaps_with(nearby_brunnels[j])
-                    for brunnel_in_group in current_group
-                ):
-                    current_group.append(nearby_brunnels[j])
-                    j += 1
-                else:
-                    break
+            while j < count and types[j] == group_type and starts[j] <= group_end:
+                if ends[j] > group_end:
+                    group_end = ends[j]
+                j += 1
 
             # Only add groups with more than one brunnel
-            if len(current_group) > 1:
-                overlap_groups.append(current_group)
+            if j - i > 1:
+                overlap_groups.append(nearby_brunnels[i:j])
 
-            i = j if j > i + 1 else i + 1
+            i = j
 
         return overlap_groups
 
@@ -192,33 +264,41 @@ class Route:
         """Process a single overlap group, keeping the nearest and excluding others."""
         logger.debug(f"Processing overlap group with {len(group)} brunnels")
 
-        # Assign the same overlap_group list to all brunnels in this group
+        # Share one immutable overlap_group tuple among all brunnels in this group
+        group_ref = tuple(group)
         for brunnel in group:
-            brunnel.overlap_group = group
+            brunnel.overlap_group = group_ref
+
+        # Descriptions are only needed for debug output, so skip building them
+        # (and the f-strings around them) unless debug logging is enabled
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
         # Calculate average distance to route for each brunnel in the group
         brunnel_distances = []
         for brunnel in group:
             avg_distance = self.average_distance_to_brunnel(brunnel)
             brunnel_distances.append((brunnel, avg_distance))
-            logger.debug(
-                f"  {brunnel.get_short_description()}: avg distance = {avg_distance:.3f}km"
-            )
+            if debug_enabled:
+                logger.debug(
+                    f"  {brunnel.get_short_description()}: avg distance = {avg_distance:.3f}km"
+                )
 
         # Sort by distance (closest first)
         brunnel_distances.sort(key=lambda x: x[1])
 
         # Keep the closest, exclude the rest
         closest_brunnel, closest_distance = brunnel_distances[0]
-        logger.debug(
-            f"  Keeping closest: {closest_brunnel.get_short_description()} (distance: {closest_distance:.3f}km)"
-        )
+        if debug_enabled:
+            logger.debug(
+                f"  Keeping closest: {closest_brunnel.get_short_description()} (distance: {closest_distance:.3f}km)"
+            )
 
         for brunnel, distance in brunnel_distances[1:]:
             brunnel.exclusion_reason = ExclusionReason.ALTERNATIVE
-            logger.debug(
-                f"  Excluded: {brunnel.get_short_description()} (distance: {distance:.3f}km, reason: {brunnel.exclusion_reason})"
-            )
+            if debug_enabled:
+                logger.debug(
+                    f"  Excluded: {brunnel.get_short_description()} (distance: {distance:.3f}km, reason: {brunnel.exclusion_reason})"
+                )
 
     def exclude_overlapping_brunnels(
         self,
@@ -243,6 +323,11 @@ class Route:
             logger.debug("No overlapping brunnels found")
             return
 
+        # Compute average distances for all grouped brunnels in one batch
+        self._cache_average_distances(
+            [brunnel for group in overlap_groups for brunnel in group]
+        )
+
         # Process each overlap group
         for group in overlap_groups:
             self._process_overlap_group(group)
@@ -253,37 +338,76 @@ class Route:
             f"Excluded {total_excluded} overlapping brunnels, keeping nearest in each group"
         )
 
-    def _update_incremental_bbox(
-        self, min_lat: float, max_lat: float, min_lon: float, max_lon: float, coord
-    ) -> Tuple[float, float, float, float]:
+    def _find_chunk_end(
+        self, start_idx: int, max_degrees_squared: float
+    ) -> Tuple[int, float, Tuple[float, float, float, float]]:
         """
-        Update bounding box incrementally by adding a new coordinate.
+        Find where a query chunk starting at start_idx must end.
 
-        Leverages the fact that when adding a coordinate, at least one corner
-        of the bounding box remains unchanged, avoiding expensive recalculation.
+        The chunk grows point by point until its bounding box reaches
+        max_degrees_squared or the route ends. Running minima and maxima over a
+        window of points give the bounding box after each point in one pass;
+        the window doubles until it contains the end of the chunk.
 
         Args:
-            min_lat, max_lat, min_lon, max_lon: Current bounding box
-            coord: New coordinate to include
+            start_idx: Index of the chunk's first route point
+            max_degrees_squared: Bounding box size that ends a chunk
 
         Returns:
-            Updated (min_lat, max_lat, min_lon, max_lon) tuple
+            Tuple of (end_idx, degrees_squared, (min_lat, max_lat, min_lon, max_lon))
+            describing the chunk's last point and its unbuffered bounding box
         """
-        new_lat = coord.latitude
-        new_lon = coord.longitude
+        last_idx = len(self.latitudes) - 1
+        window = CHUNK_SCAN_WINDOW
+
+        while True:
+            stop = min(start_idx + window, last_idx) + 1
+            latitudes = self.latitudes[start_idx:stop]
+            longitudes = self.longitudes[start_idx:stop]
+            min_lats = np.minimum.accumulate(latitudes)
+            max_lats = np.maximum.accumulate(latitudes)
+            min_lons = np.minimum.accumulate(longitudes)
+            max_lons = np.maximum.accumulate(longitudes)
+            degrees_squared = (max_lats - min_lats) * (max_lons - min_lons)
+
+            exceeded = np.flatnonzero(degrees_squared[1:] >= max_degrees_squared)
+            if len(exceeded) > 0:
+                end = int(exceeded[0]) + 1
+            elif stop > last_idx:
+                end = len(latitudes) - 1
+            else:
+                window *= 2
+                continue
+
+            return (
+                start_idx + end,
+                float(degrees_squared[end]),
+                (
+                    float(min_lats[end]),
+                    float(max_lats[end]),
+                    float(min_lons[end]),
+                    float(max_lons[end]),
+                ),
+            )
 
-        # Update only the bounds that need to change
-        if new_lat < min_lat:
-            min_lat = new_lat
-        elif new_lat > max_lat:
-            max_lat = new_lat
+    def get_track_distances(self) -> np.ndarray:
+        """
+        Get the great-circle distance from the route start to each route point.
 
-        if new_lon < min_lon:
-            min_lon = new_lon
-        elif new_lon > max_lon:
-            max_lon = new_lon
+        The haversine segment distances are computed in one vectorized pass and
+        accumulated, then memoized for the lifetime of the route.
 
-        return min_lat, max_lat, min_lon, max_lon
+        Returns:
+            Array with one cumulative distance in meters per route point
+        """
+        if self._track_distances is None:
+            track_distances = np.zeros(len(self.latitudes))
+            np.cumsum(
+                haversine_distances(self.latitudes, self.longitudes),
+                out=track_distances[1:],
+            )
+            self._track_distances = track_distances
+        return self._track_distances
 
     def _chunk_route_for_queries(
         self, buffer_meters: float = 10.0
@@ -305,77 +429,50 @@ class Route:
 
         chunks = []
         start_idx = 0
-        cumulative_distance = 0.0
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
-        # Initialize bounding box with first coordinate
-        first_coord = self.coords[0]
-        min_lat = max_lat = first_coord.latitude
-        min_lon = max_lon = first_coord.longitude
+        # Distances along the route are only needed for logging
+        track_distances = self.get_track_distances() if debug_enabled else None
 
-        for i in range(1, len(self.coords)):
-            prev_coord = self.coords[i - 1]
-            curr_coord = self.coords[i]
+        last_idx = len(self.latitudes) - 1
 
-            # Calculate distance for logging
-            lat1, lon1 = math.radians(prev_coord.latitude), math.radians(
-                prev_coord.longitude
-            )
-            lat2, lon2 = math.radians(curr_coord.latitude), math.radians(
-                curr_coord.longitude
+        while start_idx < last_idx:
+            # Find where the bounding box reaches the size threshold (or the
+            # route ends); the next chunk starts at that point
+            i, degrees_squared, (min_lat, max_lat, min_lon, max_lon) = (
+                self._find_chunk_end(start_idx, MAX_DEGREES_SQUARED)
             )
 
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = (
-                math.sin(dlat / 2) ** 2
-                + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+            # Add buffer in degrees (approximate)
+            avg_lat = (min_lat + max_lat) / 2
+            lat_buffer = buffer_meters / METERS_PER_DEGREE
+            lon_buffer = buffer_meters / (
+                METERS_PER_DEGREE * abs(math.cos(math.radians(avg_lat)))
             )
-            distance = 2 * 6371000 * math.asin(math.sqrt(a))  # Earth radius in meters
-            cumulative_distance += distance
 
-            # Update bounding box incrementally (much faster than recalculating)
-            min_lat, max_lat, min_lon, max_lon = self._update_incremental_bbox(
-                min_lat, max_lat, min_lon, max_lon, curr_coord
+            bbox = (
+                max(-90.0, min_lat - lat_buffer),  # south
+                max(-180.0, min_lon - lon_buffer),  # west
+                min(90.0, max_lat + lat_buffer),  # north
+                min(180.0, max_lon + lon_buffer),  # east
             )
 
-            # Fast bounding box size check using degrees
-            lat_diff = max_lat - min_lat
-            lon_diff = max_lon - min_lon
-            degrees_squared = lat_diff * lon_diff
-
-            # Create chunk when we exceed size threshold or reach the end
-            if degrees_squared >= MAX_DEGREES_SQUARED or i == len(self.coords) - 1:
-                # Add buffer in degrees (approximate)
-                avg_lat = (min_lat + max_lat) / 2
-                lat_buffer = buffer_meters / 111000.0
-                lon_buffer = buffer_meters / (
-                    111000.0 * abs(math.cos(math.radians(avg_lat)))
-                )
-
-                bbox = (
-                    max(-90.0, min_lat - lat_buffer),  # south
-                    max(-180.0, min_lon - lon_buffer),  # west
-                    min(90.0, max_lat + lat_buffer),  # north
-                    min(180.0, max_lon + lon_buffer),  # east
-                )
-
-                chunks.append((start_idx, i, bbox))
+            chunks.append((start_idx, i, bbox))
 
-                # Calculate approximate area for logging
+            # Calculate approximate area for logging
+            if track_distances is not None:
+                chunk_distance = track_distances[i] - track_distances[start_idx]
                 approx_area_sq_km = degrees_squared * 111.0 * 111.0
                 logger.debug(
                     f"Chunk {len(chunks)}: points {start_idx}-{i} "
-                    f"({cumulative_distance/1000:.1f}km), "
+                    f"({chunk_distance/1000:.1f}km), "
                     f"area: {approx_area_sq_km:.1f} sq km, "
                     f"bbox: {bbox[0]:.3f},{bbox[1]:.3f},"
                     f"{bbox[2]:.3f},{bbox[3]:.3f}"
                 )
 
-                # Start next chunk and reset bounding box to current coordinate
-                start_idx = i
-                cumulative_distance = 0.0
-                min_lat = max_lat = curr_coord.latitude
-                min_lon = max_lon = curr_coord.longitude
+            # Start next chunk at the current point
+            start_idx = i
 
         return chunks
 
@@ -394,7 +491,7 @@ class Route:
         """
 
         # Check if route is long enough to need chunking
-        route_length_km = self.linestring.length / 1000.0
+        route_length_km = self.length / 1000.0
         max_chunk_area_sq_km = 50000.0
 
         if route_length_km <= 500.0:  # Still use distance for very short routes
@@ -404,25 +501,35 @@ class Route:
             # Long route - use area-based chunked queries
             return self._find_brunnels_chunked_queries(args, max_chunk_area_sq_km)
 
+    @staticmethod
+    def _approximate_area_sq_km(bbox: Tuple[float, float, float, float]) -> float:
+        """
+        Approximate the area of a bounding box in square kilometers.
+
+        Args:
+            bbox: Bounding box as (south, west, north, east) in decimal degrees
+
+        Returns:
+            Approximate area in square kilometers
+        """
+        south, west, north, east = bbox
+        avg_lat = (north + south) / 2
+        lat_km = (north - south) * 111.0
+        lon_km = (east - west) * 111.0 * abs(math.cos(math.radians(avg_lat)))
+        return lat_km * lon_km
+
     def _find_brunnels_single_query(
         self, args: argparse.Namespace
     ) -> Dict[str, Brunnel]:
         """Find brunnels using a single Overpass query for short routes."""
         bbox = self.get_bbox(args.query_buffer)
 
-        # Calculate and log query area before API call
-        south, west, north, east = bbox
-        lat_diff = north - south
-        lon_diff = east - west
-        avg_lat = (north + south) / 2
-        lat_km = lat_diff * 111.0
-        lon_km = lon_diff * 111.0 * abs(math.cos(math.radians(avg_lat)))
-        area_sq_km = lat_km * lon_km
-
-        logger.debug(
-            f"Querying Overpass API for bridges and tunnels in "
-            f"{area_sq_km:.1f} sq km area..."
-        )
+        # Log query area before API call
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"Querying Overpass API for bridges and tunnels in "
+                f"{self._approximate_area_sq_km(bbox):.1f} sq km area..."
+            )
 
         # Get separated bridge and tunnel data
         raw_bridges, raw_tunnels = query_overpass_brunnels(bbox, args)
@@ -436,7 +543,7 @@ class Route:
         chunks = self._chunk_route_for_queries(args.query_buffer)
 
         logger.info(
-            f"Long route ({self.linestring.length/1000:.1f}km) - "
+            f"Long route ({self.length/1000:.1f}km) - "
             f"breaking into {len(chunks)} chunks for Overpass queries"
         )
 
@@ -444,90 +551,227 @@ class Route:
         all_raw_tunnels = []
         total_area_sq_km = 0.0
 
-        for i, (start_idx, end_idx, bbox) in enumerate(chunks):
-            # Calculate chunk area for logging
-            south, west, north, east = bbox
-            lat_diff = north - south
-            lon_diff = east - west
-            avg_lat = (north + south) / 2
-            lat_km = lat_diff * 111.0
-            lon_km = lon_diff * 111.0 * abs(math.cos(math.radians(avg_lat)))
-            area_sq_km = lat_km * lon_km
-            total_area_sq_km += area_sq_km
+        # Chunk areas are only needed for logging
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            for i, (start_idx, end_idx, bbox) in enumerate(chunks):
+                area_sq_km = self._approximate_area_sq_km(bbox)
+                total_area_sq_km += area_sq_km
+                logger.debug(
+                    f"Chunk {i+1}/{len(chunks)}: querying {area_sq_km:.1f} sq km "
+                    f"area (points {start_idx}-{end_idx})"
+                )
 
-            logger.debug(
-                f"Chunk {i+1}/{len(chunks)}: querying {area_sq_km:.1f} sq km area "
-                f"(points {start_idx}-{end_idx})"
+        # Overpass queries are network-bound, so overlap them on a few threads;
+        # results are collected in chunk order
+        with ThreadPoolExecutor(
+            max_workers=min(len(chunks), MAX_CONCURRENT_QUERIES)
+        ) as executor:
+            results = executor.map(
+                lambda chunk: query_overpass_brunnels(chunk[2], args), chunks
             )
+            for raw_bridges, raw_tunnels in results:
+                all_raw_bridges.extend(raw_bridges)
+                all_raw_tunnels.extend(raw_tunnels)
 
-            # Query this chunk
-            raw_bridges, raw_tunnels = query_overpass_brunnels(bbox, args)
-            all_raw_bridges.extend(raw_bridges)
-            all_raw_tunnels.extend(raw_tunnels)
-
-        logger.debug(
-            f"Completed {len(chunks)} chunked queries covering {total_area_sq_km:.1f} sq km total"
-        )
-
-        # Merge results by OSM ID to remove duplicates
-        bridges_by_id = {way["id"]: way for way in all_raw_bridges}
-        tunnels_by_id = {way["id"]: way for way in all_raw_tunnels}
-
-        merged_bridges = list(bridges_by_id.values())
-        merged_tunnels = list(tunnels_by_id.values())
-
-        logger.debug(
-            f"Merged results: {len(merged_bridges)} unique bridges, "
-            f"{len(merged_tunnels)} unique tunnels "
-            f"(removed {len(all_raw_bridges) - len(merged_bridges)} duplicate bridges, "
-            f"{len(all_raw_tunnels) - len(merged_tunnels)} duplicate tunnels)"
-        )
+        if debug_enabled:
+            logger.debug(
+                f"Completed {len(chunks)} chunked queries covering "
+                f"{total_area_sq_km:.1f} sq km total"
+            )
 
-        return self._process_raw_brunnel_data(merged_bridges, merged_tunnels)
+        # Overlapping chunks return some ways more than once; they are merged
+        # by OSM ID before parsing
+        return self._process_raw_brunnel_data(all_raw_bridges, all_raw_tunnels)
 
     def _process_raw_brunnel_data(
         self, raw_bridges: List[Dict], raw_tunnels: List[Dict]
     ) -> Dict[str, Brunnel]:
-        """Process raw bridge and tunnel data into Brunnel objects."""
-        brunnels = {}
+        """
+        Process raw bridge and tunnel data into Brunnel objects.
 
-        # Process bridges
-        for way_data in raw_bridges:
-            try:
-                brunnel = Brunnel.from_overpass_data(
-                    way_data, BrunnelType.BRIDGE, self.projection
-                )
-                brunnel_id = brunnel.get_id()
-                brunnels[brunnel_id] = brunnel
-            except (KeyError, ValueError) as e:
-                logger.warning(f"Failed to parse bridge way: {e}")
-                continue
+        Ways are merged by OSM ID before parsing, so each unique way is
+        projected and built into a Brunnel exactly once.
+        """
+        bridges_by_id = {str(way.get("id", "unknown")): way for way in raw_bridges}
+        tunnels_by_id = {str(way.get("id", "unknown")): way for way in raw_tunnels}
+
+        duplicate_count = (
+            len(raw_bridges)
+            - len(bridges_by_id)
+            + len(raw_tunnels)
+            - len(tunnels_by_id)
+        )
+        if duplicate_count > 0:
+            logger.debug(
+                f"Merged results: {len(bridges_by_id)} unique bridges, "
+                f"{len(tunnels_by_id)} unique tunnels "
+                f"(removed {len(raw_bridges) - len(bridges_by_id)} duplicate bridges, "
+                f"{len(raw_tunnels) - len(tunnels_by_id)} duplicate tunnels)"
+            )
 
-        # Process tunnels
-        for way_data in raw_tunnels:
-            try:
-                brunnel = Brunnel.from_overpass_data(
-                    way_data, BrunnelType.TUNNEL, self.projection
-                )
-                brunnel_id = brunnel.get_id()
-                if brunnel_id in brunnels:
+        # Extract the coordinates of each way, skipping tunnels that are also
+        # tagged as bridges
+        parsed_ways: List[Tuple[str, Dict, BrunnelType, Sequence[Position]]] = []
+        for brunnel_type, ways_by_id in (
+            (BrunnelType.BRIDGE, bridges_by_id),
+            (BrunnelType.TUNNEL, tunnels_by_id),
+        ):
+            for brunnel_id, way_data in ways_by_id.items():
+                if brunnel_type == BrunnelType.TUNNEL and brunnel_id in bridges_by_id:
                     logger.error(
                         f"OSM database error: way {brunnel_id} tagged as both bridge and tunnel; ignoring tunnel tag"
                     )
                     continue
-                brunnels[brunnel_id] = brunnel
-            except (KeyError, ValueError) as e:
-                logger.warning(f"Failed to parse tunnel way: {e}")
+                try:
+                    way_positions = Brunnel.coords_from_overpass_data(way_data)
+                except KeyError as e:
+                    logger.warning(f"Failed to parse {brunnel_type.value} way: {e}")
+                    continue
+                parsed_ways.append((brunnel_id, way_data, brunnel_type, way_positions))
+
+        # Store the coordinates of every way with enough points in shared
+        # latitude/longitude arrays, and project them in a single batch
+        valid_coords = [
+            way_coords for _, _, _, way_coords in parsed_ways if len(way_coords) >= 2
+        ]
+        counts = [len(way_coords) for way_coords in valid_coords]
+        positions = np.array(
+            [position for way_coords in valid_coords for position in way_coords],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        latitudes = np.ascontiguousarray(positions[:, 0])
+        longitudes = np.ascontiguousarray(positions[:, 1])
+        linestrings = coords_to_polylines(
+            PositionArray(latitudes, longitudes), counts, self.projection
+        )
+
+        brunnels: Dict[str, Brunnel] = {}
+        start = 0
+        valid_index = 0
+        for brunnel_id, way_data, brunnel_type, way_coords in parsed_ways:
+            coords: Sequence[Position] = way_coords
+            linestring = None
+            if len(coords) >= 2:
+                end = start + len(coords)
+                coords = PositionArray(latitudes[start:end], longitudes[start:end])
+                linestring = linestrings[valid_index]
+                start = end
+                valid_index += 1
+            try:
+                brunnels[brunnel_id] = Brunnel(
+                    coords=coords,
+                    metadata=way_data,
+                    brunnel_type=brunnel_type,
+                    projection=self.projection,
+                    linestring=linestring,
+                )
+            except ValueError as e:
+                logger.warning(f"Failed to parse {brunnel_type.value} way: {e}")
                 continue
 
         return brunnels
 
+    def _get_segment_tree(self) -> shapely.STRtree:
+        """
+        Get an STRtree indexing each segment of the projected route linestring.
+
+        Nearest-segment queries against the tree visit only a handful of
+        candidate segments, instead of scanning the whole route per query.
+
+        Returns:
+            STRtree whose geometries are the route's two-point segments
+        """
+        if self._segment_tree is None:
+            route_coords = self.projected_coords
+            segments = shapely.linestrings(
+                np.stack([route_coords[:-1], route_coords[1:]], axis=1)
+            )
+            self._segment_tree = shapely.STRtree(
+                segments, node_capacity=10  # type: ignore[arg-type]
+            )
+        return self._segment_tree
+
+    def get_segment_geometry(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the cumulative distances and unit directions of the projected route.
+
+        These are invariant for the route, so they are computed once and shared
+        by every brunnel alignment check rather than being re-derived from a
+        route substring per brunnel segment.
+
+        Returns:
+            Tuple of (cumulative_distances, directions): cumulative_distances has
+            one entry per route point giving its distance along the route in
+            meters, and directions has one (x, y) unit vector per route segment,
+            with NaN for zero-length segments
+        """
+        if self._segment_geometry is None:
+            route_coords = self.projected_coords
+            vectors = np.diff(route_coords, axis=0)
+            lengths = np.sqrt(vectors[:, 0] ** 2 + vectors[:, 1] ** 2)
+
+            cumulative_distances = np.zeros(len(route_coords))
+            np.cumsum(lengths, out=cumulative_distances[1:])
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                directions = vectors / lengths[:, np.newaxis]
+            directions[lengths == 0] = np.nan
+
+            self._segment_geometry = (cumulative_distances, directions)
+        return self._segment_geometry
+
+    def locate_points(self, coords: np.ndarray) -> np.ndarray:
+        """
+        Find the distance along the route to the closest route point for each point.
+
+        This gives the same results as shapely.line_locate_point on the route
+        linestring, which scans every route segment for every point. Instead,
+        the nearest segment is found with the segment index (taking the first
+        segment along the route when several are equally near), the point is
+        projected onto it, and the result is offset by the cumulative distance
+        to the segment's start.
+
+        Args:
+            coords: (N, 2) array of projected (x, y) coordinates
+
+        Returns:
+            Array of N distances along the route in meters
+        """
+        cumulative_distances, _ = self.get_segment_geometry()
+        route_coords = self.projected_coords
+
+        # Nearest route segment for each point, preferring the lowest index
+        (point_indices, segment_indices), _ = self._get_segment_tree().query_nearest(
+            shapely.points(coords), return_distance=True, all_matches=True
+        )
+        segments = np.full(len(coords), len(route_coords), dtype=np.intp)
+        np.minimum.at(segments, point_indices, segment_indices)
+
+        # Fraction along each segment of the point's projection, clamped to
+        # the segment as GEOS does; zero-length segments locate at their start
+        starts = route_coords[segments]
+        ends = route_coords[segments + 1]
+        dx = ends[:, 0] - starts[:, 0]
+        dy = ends[:, 1] - starts[:, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fractions = (
+                (coords[:, 0] - starts[:, 0]) * dx + (coords[:, 1] - starts[:, 1]) * dy
+            ) / (dx * dx + dy * dy)
+        fractions[(coords == starts).all(axis=1)] = 0.0
+        fractions[(coords == ends).all(axis=1)] = 1.0
+        fractions[np.isnan(fractions)] = 0.0
+        np.clip(fractions, 0.0, 1.0, out=fractions)
+
+        return cumulative_distances[segments] + fractions * np.sqrt(dx * dx + dy * dy)
+
     def average_distance_to_brunnel(self, brunnel: Brunnel) -> float:
         """
         Calculate the average distance from all points in a brunnel to the closest points on this route.
 
         The distance is measured in projected coordinates (typically meters) and then
-        averaged and converted to kilometers.
+        averaged and converted to kilometers. Results are memoized per brunnel ID,
+        since the route geometry never changes after construction.
 
         Args:
             brunnel: Brunnel object to calculate distances for.
@@ -535,15 +779,54 @@ class Route:
         Returns:
             float: Average distance in kilometers.
         """
+        brunnel_id = brunnel.get_id()
+        cached = self._avg_distance_cache.get(brunnel_id)
+        if cached is not None:
+            return cached
+
+        # The distance to the route is the distance to its nearest segment
+        points = shapely.points(shapely.get_coordinates(brunnel.linestring))
+        _, distances = self._get_segment_tree().query_nearest(
+            points, return_distance=True, all_matches=False
+        )
+
+        avg_distance = float(distances.mean()) / 1000.0  # Convert to kilometers
+        self._avg_distance_cache[brunnel_id] = avg_distance
+        return avg_distance
 
-        points = [Point(coord) for coord in brunnel.linestring.coords]
+    def _cache_average_distances(self, brunnels: List[Brunnel]) -> None:
+        """
+        Compute and memoize average route distances for several brunnels at once.
 
-        total_distance = 0.0
+        The points of all brunnels without a cached distance are matched to
+        their nearest route segments in a single spatial index query, and the
+        results are averaged per brunnel.
+
+        Args:
+            brunnels: Brunnels whose average distances should be cached
+        """
+        pending: Dict[str, Brunnel] = {}
+        for brunnel in brunnels:
+            brunnel_id = brunnel.get_id()
+            if brunnel_id not in self._avg_distance_cache:
+                pending[brunnel_id] = brunnel
+        if not pending:
+            return
 
-        for point in points:
-            total_distance += point.distance(self.linestring)
+        linestrings = [b.linestring for b in pending.values()]
+        offsets = np.zeros(len(linestrings) + 1, dtype=np.intp)
+        np.cumsum(shapely.get_num_coordinates(linestrings), out=offsets[1:])
+        _, distances = self._get_segment_tree().query_nearest(
+            shapely.points(shapely.get_coordinates(linestrings)),
+            return_distance=True,
+            all_matches=False,
+        )
 
-        return total_distance / len(points) / 1000.0  # Convert to kilometers
+        for i, brunnel_id in enumerate(pending):
+            brunnel_distances = distances[offsets[i] : offsets[i + 1]]
+            self._avg_distance_cache[brunnel_id] = (
+                float(brunnel_distances.mean()) / 1000.0
+            )
 
     @classmethod
     def from_gpx(cls, file_input: TextIO) -> "Route":
@@ -560,35 +843,85 @@ class Route:
             RuntimeError: If the route crosses the antimeridian or approaches poles.
             gpxpy.gpx.GPXException: If GPX file is malformed.
         """
-        gpx_data = gpxpy.parse(file_input)
+        latitudes = array("d")
+        longitudes = array("d")
+
+        # Stream the track points from all tracks and segments straight into
+        # coordinate buffers, instead of building gpxpy's full object model (or
+        # a Position per point) only to copy the coordinates out
+        try:
+            events = ElementTree.iterparse(file_input, events=("start", "end"))
+            _, root = next(events)
+            if root.tag.rpartition("}")[2] != "gpx":
+                raise gpxpy.gpx.GPXException("Document must have a `gpx` root node.")
+
+            for event, element in events:
+                if event != "end" or element.tag.rpartition("}")[2] != "trkpt":
+                    continue
+                try:
+                    latitude = float(element.attrib["lat"])
+                    longitude = float(element.attrib["lon"])
+                except (KeyError, ValueError):
+                    raise gpxpy.gpx.GPXException(
+                        cls._describe_invalid_track_point(element, len(latitudes) + 1)
+                    ) from None
+                latitudes.append(latitude)
+                longitudes.append(longitude)
+                element.clear()
+        except ElementTree.ParseError as e:
+            raise gpxpy.gpx.GPXXMLSyntaxException(f"Error parsing XML: {e}", e)
+
+        # Note: The __init__ method will raise ValueError if there are fewer than 2 points.
+        route = cls(
+            PositionArray(
+                np.frombuffer(latitudes, dtype=np.float64),
+                np.frombuffer(longitudes, dtype=np.float64),
+            )
+        )
 
-        coords_data = []
+        logger.debug(f"Parsed {len(route.coords)} track points from GPX file")
 
-        # Extract all track points from all tracks and segments
-        for track in gpx_data.tracks:
-            for segment in track.segments:
-                for point in segment.points:
-                    coords_data.append(
-                        Position(
-                            latitude=point.latitude,
-                            longitude=point.longitude,
-                        )
-                    )
+        return route
 
-        # Note: The __init__ method will raise ValueError if coords_data is empty or has less than 2 points.
-        route = cls(coords_data)
+    @staticmethod
+    def _describe_invalid_track_point(
+        element: ElementTree.Element, point_number: int
+    ) -> str:
+        """
+        Describe why a track point's coordinates could not be read.
 
-        logger.debug(f"Parsed {len(route.coords)} track points from GPX file")
+        Args:
+            element: The offending trkpt element
+            point_number: 1-based position of the track point in the file
 
-        return route
+        Returns:
+            Error message naming the point and the missing or invalid attribute
+        """
+        for name in ("lat", "lon"):
+            value = element.get(name)
+            if value is None:
+                return f"Track point {point_number} is missing its `{name}` attribute"
+            try:
+                float(value)
+            except ValueError:
+                return (
+                    f"Track point {point_number} has an invalid `{name}` value: "
+                    f"{value!r}"
+                )
+        return f"Track point {point_number} has invalid coordinates"
 
     @classmethod
-    def from_file(cls, filename: str) -> "Route":
+    def from_file(cls, filename: str, use_cache: bool = True) -> "Route":
         """
         Load and parse a GPX file into a route.
 
+        Parsed coordinates are cached on disk, keyed by the file's path, size
+        and modification time, so analyzing the same unchanged GPX file again
+        skips XML parsing entirely.
+
         Args:
             filename: Path to GPX file
+            use_cache: Whether to read and write the parsed-route cache
 
         Returns:
             Route object representing the route
@@ -597,11 +930,27 @@ class Route:
             RuntimeError: If route fails validation (e.g., antimeridian crossing, polar proximity).
             FileNotFoundError: If file doesn't exist.
             PermissionError: If file can't be read.
+            UnicodeDecodeError: If file is not valid UTF-8.
             gpxpy.gpx.GPXException: If GPX file is malformed.
         """
-        logger.debug(f"Reading GPX file: {filename}")
+        # Open the file even when the cache is hit, so a missing or unreadable
+        # GPX file is reported the same way with or without a cache entry
         with open(filename, "r", encoding="utf-8") as f:
-            return cls.from_gpx(f)
+            cache_path = get_route_cache_path(filename) if use_cache else None
+            if cache_path is not None:
+                cached = load_cached_coordinates(cache_path)
+                if cached is not None:
+                    latitudes, longitudes = cached
+                    logger.debug(f"Loaded cached route for {filename}")
+                    return cls(PositionArray(latitudes, longitudes))
+
+            logger.debug(f"Reading GPX file: {filename}")
+            route = cls.from_gpx(f)
+
+        if cache_path is not None:
+            save_cached_coordinates(cache_path, route.latitudes, route.longitudes)
+
+        return route
 
     def __len__(self) -> int:
         """Return number of trackpoints in route."""
@@ -615,46 +964,71 @@ class Route:
         """Allow iteration over trackpoints."""
         return iter(self.coords)
 
-    def calculate_buffered_route_geometry(self, route_buffer: float) -> BaseGeometry:
+    def brunnels_within_buffer(
+        self, brunnels: List[Brunnel], route_buffer: float
+    ) -> np.ndarray:
         """
-        Calculate the buffered Shapely geometry for the route.
+        Test which brunnels lie within route_buffer meters of the route.
+
+        Rather than buffering the whole route, each brunnel is tested against a
+        buffer of only the route segments within route_buffer of it, found with
+        the segment STRtree. Segments further away cannot contribute to the
+        buffer around the brunnel, so this gives the same answer as testing
+        against the buffered route, but buffers a few segments per brunnel
+        instead of the full route polygon.
 
         Args:
+            brunnels: Brunnels to test.
             route_buffer: Buffer distance in meters.
 
         Returns:
-            Shapely geometry object or None if it could not be created.
-        """
-
-        route_line = self.linestring
-        if route_line is None:
-            raise ValueError(
-                "Cannot calculate buffered geometry because LineString is None"
-            )
+            Boolean array, True where the brunnel is contained in the buffer
 
+        Raises:
+            ValueError: If route_buffer is not positive.
+        """
         if route_buffer <= 0:
             raise ValueError(
                 f"Route buffer must be positive, got {route_buffer} meters"
             )
 
-        # Since we're now using projected coordinates in meters,
-        # we can use the buffer distance directly
-        route_geometry = route_line.buffer(route_buffer)
+        contained = np.zeros(len(brunnels), dtype=bool)
+        if not brunnels:
+            return contained
 
-        if not route_geometry.is_valid:
-            logger.warning(
-                "Initial buffered route geometry is invalid. Attempting to fix with buffer(0)."
-            )
-            fixed_geometry = route_geometry.buffer(0)
-            if fixed_geometry.is_valid:
-                logger.warning("Successfully fixed invalid buffered geometry.")
-                return fixed_geometry
-            else:
-                raise ValueError(
-                    "Could not fix invalid buffered geometry after attempting buffer(0). "
-                    "The geometry remains invalid."
+        linestrings = [brunnel.linestring for brunnel in brunnels]
+        brunnel_indices, segment_indices = self._get_segment_tree().query(
+            linestrings, predicate="dwithin", distance=route_buffer
+        )
+        if len(brunnel_indices) == 0:
+            return contained
+
+        # Sort hits by brunnel, then by position along the route
+        order = np.lexsort((segment_indices, brunnel_indices))
+        brunnel_indices = brunnel_indices[order]
+        segment_indices = segment_indices[order]
+
+        # Join runs of consecutive segments into route pieces, so the local
+        # buffer has the same joins as the full route between them
+        route_coords = self.projected_coords
+        hit_brunnels, first_hits = np.unique(brunnel_indices, return_index=True)
+        local_routes: List[MultiLineString] = []
+        for hits in np.split(segment_indices, first_hits[1:]):
+            breaks = np.flatnonzero(np.diff(hits) != 1) + 1
+            local_routes.append(
+                MultiLineString(
+                    [
+                        route_coords[run[0] : run[-1] + 2]
+                        for run in np.split(hits, breaks)
+                    ]
                 )
-        return route_geometry
+            )
+
+        local_buffers = shapely.buffer(local_routes, route_buffer)
+        contained[hit_brunnels] = shapely.contains(
+            local_buffers, [linestrings[i] for i in hit_brunnels]
+        )
+        return contained
 
     def exclude_misaligned_brunnels(
         self,
@@ -670,16 +1044,24 @@ class Route:
             self: The Route instance.
 
         """
-        misaligned_count = 0
-
-        for brunnel in brunnels.values():
+        candidates = [
+            brunnel
+            for brunnel in brunnels.values()
+            if brunnel.exclusion_reason == ExclusionReason.NONE
+        ]
+        # Check all candidates against the route in one vectorized pass
+        aligned = find_aligned_brunnels(candidates, self, bearing_tolerance_degrees)
 
-            if (
-                brunnel.exclusion_reason == ExclusionReason.NONE
-                and not brunnel.is_aligned_with_route(self, bearing_tolerance_degrees)
-            ):
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        misaligned_count = 0
+        for brunnel, is_aligned in zip(candidates, aligned):
+            if not is_aligned:
                 brunnel.exclusion_reason = ExclusionReason.MISALIGNED
                 misaligned_count += 1
+                if debug_enabled:
+                    logger.debug(
+                        f"{brunnel.get_short_description()} is not aligned with the route"
+                    )
 
         if misaligned_count > 0:
             logger.debug(
@@ -690,7 +1072,25 @@ class Route:
     def calculate_route_spans(self, brunnels: Dict[str, Brunnel]) -> None:
         """
         Calculate the route span for each included brunnel.
+
+        The points of all brunnels are located along the route in a single
+        pass, and each brunnel's span runs from its nearest to its farthest
+        located point.
         """
-        for brunnel in brunnels.values():
-            if brunnel.exclusion_reason == ExclusionReason.NONE:
-                brunnel.calculate_route_span(self)
+        candidates = [
+            brunnel
+            for brunnel in brunnels.values()
+            if brunnel.exclusion_reason == ExclusionReason.NONE
+        ]
+        if not candidates:
+            return
+
+        linestrings = [b.linestring for b in candidates]
+        point_counts = shapely.get_num_coordinates(linestrings)
+        offsets = np.cumsum(point_counts) - point_counts
+        distances = self.locate_points(shapely.get_coordinates(linestrings))
+        start_distances = np.minimum.reduceat(distances, offsets)
+        end_distances = np.maximum.reduceat(distances, offsets)
+
+        for brunnel, start, end in zip(candidates, start_distances, end_distances):
+            brunnel.route_span = RouteSpan(float(start), float(end))
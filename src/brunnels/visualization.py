@@ -3,37 +3,58 @@
 Route visualization using folium maps.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, FrozenSet, List, Sequence
+import json
 import logging
+import re
 import argparse
 import folium
+import numpy as np
+import shapely
 from folium.template import Template
+from folium.vector_layers import path_options
 
 from .brunnel import Brunnel, BrunnelType, ExclusionReason
+from .geometry import Position, PositionArray
 from .route import Route
 from .metrics import BrunnelMetrics
 from .overpass import ACTIVE_RAILWAY_TYPES
 
 logger = logging.getLogger(__name__)
 
+# Decimal places kept for map coordinates (about 0.1 m), well beyond what the
+# map can display
+DISPLAY_COORDINATE_DECIMALS = 6
+
+# Largest distance in meters the drawn route may stray from the GPX track when
+# route points that add no visible detail are dropped
+ROUTE_DISPLAY_TOLERANCE = 0.5
+
+# Included brunnels plus the "alternative" and "misaligned" excluded brunnels
+DISPLAYED_EXCLUSION_REASONS = frozenset(
+    {ExclusionReason.NONE, ExclusionReason.ALTERNATIVE, ExclusionReason.MISALIGNED}
+)
+
+# Tags shown as the popup's title rather than in its tag list
+NAME_TAG_KEYS = frozenset({"name", "alt_name"})
+# Metadata fields left out of the popup's "Other" list
+HIDDEN_METADATA_KEYS = frozenset({"tags", "id", "geometry", "type"})
+
+# Popup tags shown in red: every value of these keys...
+HIGHLIGHTED_TAG_KEYS = frozenset({"waterway"})
+# ...and these values of these keys
+HIGHLIGHTED_TAG_VALUES: Dict[str, FrozenSet[str]] = {
+    "bicycle": frozenset({"no"}),
+    "railway": frozenset(ACTIVE_RAILWAY_TYPES),
+}
+
 
 class BrunnelLegend(folium.MacroElement):
     """Custom legend for brunnel visualization with dynamic counts."""
 
-    def __init__(self, metrics: BrunnelMetrics):
-        super().__init__()
-        self.bridge_count = metrics.bridge_counts.get("total", 0)
-        self.tunnel_count = metrics.tunnel_counts.get("total", 0)
-        self.contained_bridge_count = metrics.bridge_counts.get("contained", 0)
-        self.contained_tunnel_count = metrics.tunnel_counts.get("contained", 0)
-        self.alternative_bridge_count = metrics.bridge_counts.get("alternative", 0)
-        self.alternative_tunnel_count = metrics.tunnel_counts.get("alternative", 0)
-        self.misaligned_bridge_count = metrics.bridge_counts.get("misaligned", 0)
-        self.misaligned_tunnel_count = metrics.tunnel_counts.get("misaligned", 0)
-
-        # Use folium's template string approach
-        self._template = Template(
-            """
+    # Parsed once and shared by every legend; the counts are read from `this`
+    _template = Template(
+        """
         {% macro html(this, kwargs) %}
         <div id="brunnel-legend" style="
             position: fixed;
@@ -93,7 +114,121 @@ class BrunnelLegend(folium.MacroElement):
         </div>
         {% endmacro %}
         """
+    )
+
+    def __init__(self, metrics: BrunnelMetrics):
+        super().__init__()
+        self.bridge_count = metrics.bridge_counts.get("total", 0)
+        self.tunnel_count = metrics.tunnel_counts.get("total", 0)
+        self.contained_bridge_count = metrics.bridge_counts.get("contained", 0)
+        self.contained_tunnel_count = metrics.tunnel_counts.get("contained", 0)
+        self.alternative_bridge_count = metrics.bridge_counts.get("alternative", 0)
+        self.alternative_tunnel_count = metrics.tunnel_counts.get("alternative", 0)
+        self.misaligned_bridge_count = metrics.bridge_counts.get("misaligned", 0)
+        self.misaligned_tunnel_count = metrics.tunnel_counts.get("misaligned", 0)
+
+
+class BrunnelLayer(folium.MacroElement):
+    """Brunnel polylines with popups, rendered together from a single template.
+
+    Adding a separate folium PolyLine and Popup for every brunnel makes folium
+    compile and render several templates per brunnel when the map is saved;
+    this element serializes all brunnels into one JSON payload and emits a
+    short Leaflet loop that draws them. Popup content is only assembled when
+    a popup is opened.
+    """
+
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = {{ this.get_payload() }};
+            {{ this.get_name() }}.lines.forEach(function (line) {
+                L.polyline(
+                    line.locations,
+                    {{ this.get_name() }}.styles[line.style]
+                ).bindPopup(
+                    function () {
+                        return '<div style="width: 100.0%; height: 100.0%;">'
+                            + line.popup + '</div>';
+                    },
+                    {"maxWidth": 400}
+                ).addTo({{ this._parent.get_name() }});
+            });
+        {% endmacro %}
+        """
+    )
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._name = "BrunnelLayer"
+        self.lines: List[Dict[str, Any]] = []
+        self.styles: List[Dict[str, Any]] = []
+        self._style_indices: Dict[str, int] = {}
+
+    def add_line(
+        self, locations: List[List[float]], popup_html: str, **kwargs: Any
+    ) -> None:
+        """
+        Add a brunnel polyline to the layer.
+
+        Args:
+            locations: List of [latitude, longitude] pairs
+            popup_html: HTML content of the polyline's popup
+            **kwargs: Leaflet path options (color, weight, opacity, ...)
+        """
+        options = path_options(line=True, **kwargs)
+        style_key = json.dumps(options, sort_keys=True)
+        style_index = self._style_indices.get(style_key)
+        if style_index is None:
+            style_index = len(self.styles)
+            self._style_indices[style_key] = style_index
+            self.styles.append(options)
+
+        self.lines.append(
+            {"locations": locations, "style": style_index, "popup": popup_html}
+        )
+
+    def get_payload(self) -> str:
+        """
+        Serialize the layer's styles and lines as a JavaScript object literal.
+
+        Returns:
+            JSON text safe to embed inside an HTML script element
+        """
+        payload = json.dumps(
+            {"styles": self.styles, "lines": self.lines},
+            ensure_ascii=False,
+            separators=(",", ":"),
         )
+        # Keep tag values from closing the enclosing script element
+        return re.sub(r"</(?=script)", r"<\\/", payload, flags=re.IGNORECASE)
+
+
+class RouteLine(folium.MacroElement):
+    """The route polyline, rendered with folium's own PolyLine template.
+
+    folium.PolyLine checks every location in Python before rendering, which
+    dominates map building for long routes. The route's display locations
+    come straight from numpy as finite [latitude, longitude] pairs, so this
+    element takes them as they are.
+    """
+
+    _template = folium.PolyLine._template
+
+    def __init__(self, locations: List[List[float]], popup: str, **kwargs: Any) -> None:
+        """
+        Create the route polyline.
+
+        Args:
+            locations: List of [latitude, longitude] pairs
+            popup: Text of the polyline's popup
+            **kwargs: Leaflet path options (color, weight, opacity, ...)
+        """
+        super().__init__()
+        self._name = "PolyLine"
+        self.locations = locations
+        self.options = path_options(line=True, **kwargs)
+        self.add_child(folium.Popup(popup))
 
 
 def format_complex_value(key: str, value: Any, indent_level: int = 0) -> str:
@@ -108,50 +243,63 @@ def format_complex_value(key: str, value: Any, indent_level: int = 0) -> str:
     Returns:
         Formatted HTML string
     """
+    lines: List[str] = []
+    _append_complex_value(lines, key, value, indent_level)
+    return "<br>".join(lines)
+
+
+def _append_complex_value(
+    lines: List[str], key: str, value: Any, indent_level: int = 0
+) -> None:
+    """
+    Append the HTML lines of a formatted complex value to a list.
+
+    Args:
+        lines: List receiving one HTML string per displayed line
+        key: The key name
+        value: The value to format
+        indent_level: Current indentation level
+    """
     indent = "&nbsp;" * (indent_level * 4)
 
     if isinstance(value, dict):
         if not value:
-            return f"{indent}<i>{key}:</i> {{}}"
+            lines.append(f"{indent}<i>{key}:</i> {{}}")
+            return
 
-        parts = [f"{indent}<i>{key}:</i>"]
+        lines.append(f"{indent}<i>{key}:</i>")
+        nested_indent = "&nbsp;" * ((indent_level + 1) * 4)
         for k, v in value.items():
             if isinstance(v, (dict, list)):
-                parts.append(format_complex_value(k, v, indent_level + 1))
+                _append_complex_value(lines, k, v, indent_level + 1)
             else:
-                nested_indent = "&nbsp;" * ((indent_level + 1) * 4)
-                parts.append(f"{nested_indent}<i>{k}:</i> {v}")
-        return "<br>".join(parts)
+                lines.append(f"{nested_indent}<i>{k}:</i> {v}")
 
     elif isinstance(value, list):
         if not value:
-            return f"{indent}<i>{key}:</i> []"
+            lines.append(f"{indent}<i>{key}:</i> []")
+            return
 
-        parts = [f"{indent}<i>{key}:</i>"]
+        lines.append(f"{indent}<i>{key}:</i>")
+        nested_indent = "&nbsp;" * ((indent_level + 1) * 4)
         for i, item in enumerate(value):
             if isinstance(item, (dict, list)):
-                parts.append(format_complex_value(f"[{i}]", item, indent_level + 1))
+                _append_complex_value(lines, f"[{i}]", item, indent_level + 1)
             else:
-                nested_indent = "&nbsp;" * ((indent_level + 1) * 4)
-                parts.append(f"{nested_indent}[{i}]: {item}")
-        return "<br>".join(parts)
+                lines.append(f"{nested_indent}[{i}]: {item}")
 
     else:
-        return f"{indent}<i>{key}:</i> {value}"
+        lines.append(f"{indent}<i>{key}:</i> {value}")
 
 
-def _format_brunnel_names(tags: Dict[str, str]) -> str:
+def _format_brunnel_names(html_parts: List[str], tags: Dict[str, str]) -> None:
     """
-    Format brunnel name and alt_name into HTML.
+    Append a brunnel's name and alt_name as HTML.
 
     Args:
+        html_parts: List of HTML fragments to append to
         tags: OSM tags dictionary
-
-    Returns:
-        HTML string with formatted names
     """
-    html_parts = []
-
     # Add name most prominently if present
     if "name" in tags:
         html_parts.append(f"<b>{tags['name']}</b>")
@@ -160,71 +308,58 @@ def _format_brunnel_names(tags: Dict[str, str]) -> str:
     if "alt_name" in tags:
         html_parts.append(f"<br><b>AKA:</b> {tags['alt_name']}")
 
-    return "".join(html_parts)
-
 
-def _format_osm_tags(tags: Dict[str, str]) -> str:
+def _format_osm_tags(html_parts: List[str], tags: Dict[str, str]) -> None:
     """
-    Format OSM tags (excluding name and alt_name) into HTML.
+    Append OSM tags (excluding name and alt_name) as HTML.
 
     Args:
+        html_parts: List of HTML fragments to append to
         tags: OSM tags dictionary
-
-    Returns:
-        HTML string with formatted tags
     """
     # Add remaining OSM tags (excluding name and alt_name which we already showed)
-    remaining_tags = {k: v for k, v in tags.items() if k not in ["name", "alt_name"]}
-    if not remaining_tags:
-        return ""
-
-    html_parts = ["<br><b>Tags:</b>"]
-    for key, value in sorted(remaining_tags.items()):
-        highlight = (
-            key == "bicycle"
-            and value == "no"
-            or key == "waterway"
-            or key == "railway"
-            and value in ACTIVE_RAILWAY_TYPES
+    if all(key in NAME_TAG_KEYS for key in tags):
+        return
+
+    html_parts.append("<br><b>Tags:</b>")
+    for key, value in sorted(tags.items()):
+        if key in NAME_TAG_KEYS:
+            continue
+        highlighted_values = HIGHLIGHTED_TAG_VALUES.get(key)
+        highlight = key in HIGHLIGHTED_TAG_KEYS or (
+            highlighted_values is not None and value in highlighted_values
         )
         prefix = "<span style='color: red;'>" if highlight else ""
         suffix = "</span>" if highlight else ""
         html_parts.append(f"<br>&nbsp;&nbsp;{prefix}<i>{key}:</i> {value}{suffix}")
 
-    return "".join(html_parts)
-
 
-def _format_other_metadata(metadata: Dict[str, Any]) -> str:
+def _format_other_metadata(html_parts: List[str], metadata: Dict[str, Any]) -> None:
     """
-    Format other metadata (non-tag, non-ID fields) into HTML.
+    Append other metadata (non-tag, non-ID fields) as HTML.
 
     Args:
+        html_parts: List of HTML fragments to append to
         metadata: Brunnel metadata dictionary
-
-    Returns:
-        HTML string with formatted metadata
     """
     # Add other metadata (excluding tags and id which we already handled,
     # geometry which is very long, and type which is always "way")
-    other_data = {
-        k: v for k, v in metadata.items() if k not in ["tags", "id", "geometry", "type"]
-    }
-    if not other_data:
-        return ""
-
-    html_parts = ["<br><b>Other:</b>"]
-    for key, value in sorted(other_data.items()):
+    if all(key in HIDDEN_METADATA_KEYS for key in metadata):
+        return
+
+    html_parts.append("<br><b>Other:</b>")
+    for key, value in sorted(metadata.items()):
+        if key in HIDDEN_METADATA_KEYS:
+            continue
         # Handle nested dictionaries or lists
         if isinstance(value, (dict, list)):
             # Use structured formatting for nodes and bounds
             if key in ["nodes", "bounds"]:
-                formatted_value = format_complex_value(key, value, 0)
+                lines: List[str] = []
+                _append_complex_value(lines, key, value, 0)
                 # Add proper indentation for the "Other:" section
-                indented_lines = []
-                for line in formatted_value.split("<br>"):
-                    if line.strip():  # Skip empty lines
-                        indented_lines.append(f"&nbsp;&nbsp;{line}")
-                html_parts.append("<br>" + "<br>".join(indented_lines))
+                for line in lines:
+                    html_parts.append(f"<br>&nbsp;&nbsp;{line}")
             else:
                 # Keep truncation for other long nested data
                 value_str = str(value)
@@ -232,53 +367,131 @@ def _format_other_metadata(metadata: Dict[str, Any]) -> str:
                     value_str = value_str[:47] + "..."
                 html_parts.append(f"<br>&nbsp;&nbsp;<i>{key}:</i> {value_str}")
         else:
-            value_str = str(value)
-            html_parts.append(f"<br>&nbsp;&nbsp;<i>{key}:</i> {value_str}")
-
-    return "".join(html_parts)
+            html_parts.append(f"<br>&nbsp;&nbsp;<i>{key}:</i> {value}")
 
 
 def brunnel_to_html(brunnel: Brunnel) -> str:
     """
     Format a brunnel's metadata into HTML for popup display.
 
+    The helpers append their fragments to one shared list, which is joined
+    once at the end.
+
     Args:
         brunnel: The Brunnel object to format
 
     Returns:
         HTML-formatted string with metadata
     """
-    html_parts = []
+    html_parts: List[str] = []
 
     if brunnel.compound_group is not None:
         compound_group = brunnel.compound_group
         html_parts.append(
-            f"Segment {compound_group.index(brunnel)+1} of {len(compound_group)} in compound group<br>"
+            f"Segment {brunnel.get_compound_index()+1} of {len(compound_group)} in compound group<br>"
         )
 
     tags = brunnel.metadata.get("tags", {})
 
     # Add formatted names
-    names_html = _format_brunnel_names(tags)
-    if names_html:
-        html_parts.append(names_html)
+    _format_brunnel_names(html_parts, tags)
 
     # Add OSM ID
     html_parts.append(f"<br><b>OSM ID:</b> {brunnel.get_id()}")
 
-    # Add formatted OSM tags
-    tags_html = _format_osm_tags(tags)
-    if tags_html:
-        html_parts.append(tags_html)
+    # Add formatted OSM tags and other metadata
+    html_parts.append(_get_metadata_html(brunnel))
+
+    return "".join(html_parts)
 
-    # Add formatted other metadata
-    other_html = _format_other_metadata(brunnel.metadata)
-    if other_html:
-        html_parts.append(other_html)
 
+def brunnel_to_short_html(brunnel: Brunnel) -> str:
+    """
+    Format a brunnel's names and OSM ID into HTML for a compact popup.
+
+    Args:
+        brunnel: The Brunnel object to format
+
+    Returns:
+        HTML-formatted string with the brunnel's names and OSM ID
+    """
+    html_parts: List[str] = []
+    _format_brunnel_names(html_parts, brunnel.metadata.get("tags", {}))
+    html_parts.append(f"<br><b>OSM ID:</b> {brunnel.get_id()}")
     return "".join(html_parts)
 
 
+def _get_metadata_html(brunnel: Brunnel) -> str:
+    """
+    Get the popup HTML for a brunnel's OSM tags and other metadata.
+
+    The result depends only on the brunnel's metadata, so it is memoized on
+    the brunnel and reused when the map is built again.
+
+    Args:
+        brunnel: The Brunnel object to format
+
+    Returns:
+        HTML string with the formatted tags and other metadata
+    """
+    if brunnel.metadata_html is None:
+        html_parts: List[str] = []
+        _format_osm_tags(html_parts, brunnel.metadata.get("tags", {}))
+        _format_other_metadata(html_parts, brunnel.metadata)
+        brunnel.metadata_html = "".join(html_parts)
+    return brunnel.metadata_html
+
+
+def _to_display_locations(coords: Sequence[Position]) -> List[List[float]]:
+    """
+    Convert positions to [latitude, longitude] pairs for the map.
+
+    Coordinates are rounded to DISPLAY_COORDINATE_DECIMALS places, which keeps
+    the generated HTML compact without visibly moving anything.
+
+    Args:
+        coords: Sequence of Position objects
+
+    Returns:
+        List of [latitude, longitude] pairs
+    """
+    if isinstance(coords, PositionArray):
+        locations = np.column_stack((coords.latitudes, coords.longitudes))
+    else:
+        locations = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    return np.round(locations, DISPLAY_COORDINATE_DECIMALS).tolist()
+
+
+def _simplify_route_for_display(route: Route) -> PositionArray:
+    """
+    Drop route points that add no visible detail to the map.
+
+    The route is simplified with Douglas-Peucker in its projected coordinates,
+    keeping the points needed to stay within ROUTE_DISPLAY_TOLERANCE meters of
+    the GPX track. Each point's index is carried along as its Z coordinate, so
+    the kept points can be read back in latitude and longitude.
+
+    Args:
+        route: Route object to simplify
+
+    Returns:
+        The kept route positions, including the first and last points
+    """
+    indexed_coords = np.column_stack(
+        (route.projected_coords, np.arange(len(route.projected_coords)))
+    )
+    simplified = shapely.simplify(
+        shapely.linestrings(indexed_coords),
+        ROUTE_DISPLAY_TOLERANCE,
+        preserve_topology=False,
+    )
+    kept = shapely.get_coordinates(simplified, include_z=True)[:, 2].astype(np.intp)
+    logger.debug(
+        f"Displaying {len(kept)} of {len(route.projected_coords)} route points"
+    )
+    return PositionArray(route.latitudes[kept], route.longitudes[kept])
+
+
 def _setup_map_with_layers(center_lat: float, center_lon: float) -> folium.Map:
     """
     Create and configure a folium map with tile layers.
@@ -290,9 +503,11 @@ def _setup_map_with_layers(center_lat: float, center_lon: float) -> folium.Map:
     Returns:
         Configured folium Map instance
     """
+    # Draw vector layers on a single canvas rather than one SVG element per line
     route_map = folium.Map(
         location=[center_lat, center_lon],
         tiles=None,
+        prefer_canvas=True,
     )
 
     # Add Standard layer (CartoDB positron)
@@ -333,11 +548,11 @@ def _add_route_to_map(route_map: folium.Map, route: Route) -> None:
         route_map: Folium map instance
         route: Route object to display
     """
-    # Convert route to coordinate pairs for folium
-    coordinates = [[pos.latitude, pos.longitude] for pos in route.coords]
+    # Convert the simplified route to coordinate pairs for folium
+    coordinates = _to_display_locations(_simplify_route_for_display(route))
 
     # Add route as polyline
-    folium.PolyLine(
+    RouteLine(
         coordinates,
         color="#2E86AB",
         weight=2,
@@ -346,15 +561,15 @@ def _add_route_to_map(route_map: folium.Map, route: Route) -> None:
         z_index=1,
     ).add_to(route_map)
 
-    # Add start and end markers
+    # Add start and end markers at the ends of the displayed line
     folium.Marker(
-        [route[0].latitude, route[0].longitude],
+        coordinates[0],
         popup="Start",
         icon=folium.Icon(color="green", icon="play"),
     ).add_to(route_map)
 
     folium.Marker(
-        [route[-1].latitude, route[-1].longitude],
+        coordinates[-1],
         popup="End",
         icon=folium.Icon(color="red", icon="stop"),
     ).add_to(route_map)
@@ -402,30 +617,32 @@ def _get_brunnel_style(brunnel: Brunnel) -> Dict[str, Any]:
     return {"color": color, "weight": weight, "opacity": opacity}
 
 
-def _add_brunnels_to_map(route_map: folium.Map, brunnels: Dict[str, Brunnel]) -> None:
+def _add_brunnels_to_map(
+    route_map: folium.Map, brunnels: Dict[str, Brunnel], minimal_popups: bool = False
+) -> None:
     """
     Add brunnels to the map with appropriate styling and popups.
 
     Args:
         route_map: Folium map instance
         brunnels: Dictionary of Brunnel objects to display
+        minimal_popups: Whether popups of excluded brunnels show only their
+            names and OSM ID instead of the full metadata
     """
+    brunnel_layer = BrunnelLayer()
+
     for brunnel in brunnels.values():
-        brunnel_coords = [[pos.latitude, pos.longitude] for pos in brunnel.coords]
+        # Skip excluded brunnels before doing any per-brunnel work
+        exclusion_reason = brunnel.exclusion_reason
+        if exclusion_reason not in DISPLAYED_EXCLUSION_REASONS:
+            continue
+
+        brunnel_coords = _to_display_locations(brunnel.coords)
         if not brunnel_coords:
             continue
 
-        exclusion_reason = brunnel.exclusion_reason
         route_span = brunnel.get_route_span()
 
-        # Display included brunnels, "alternative", and "misaligned" excluded brunnels
-        if exclusion_reason not in [
-            ExclusionReason.NONE,
-            ExclusionReason.ALTERNATIVE,
-            ExclusionReason.MISALIGNED,
-        ]:
-            continue
-
         # Get styling for this brunnel
         style = _get_brunnel_style(brunnel)
 
@@ -446,18 +663,23 @@ def _add_brunnels_to_map(route_map: folium.Map, brunnels: Dict[str, Brunnel]) ->
         popup_header = (
             f"<b>{brunnel.brunnel_type.value.capitalize()}</b> ({status})<br>"
         )
-        metadata_html = brunnel_to_html(brunnel)
+        if minimal_popups and exclusion_reason != ExclusionReason.NONE:
+            metadata_html = brunnel_to_short_html(brunnel)
+        else:
+            metadata_html = brunnel_to_html(brunnel)
         popup_text = popup_header + metadata_html
 
-        # Add brunnel to map
-        folium.PolyLine(
+        # Add brunnel to the layer
+        brunnel_layer.add_line(
             brunnel_coords,
+            popup_text,
             color=style["color"],
             weight=style["weight"],
             opacity=style["opacity"],
-            popup=folium.Popup(popup_text, max_width=400),
-            z_index=2,  # Ensure brunnels are above route
-        ).add_to(route_map)
+        )
+
+    # Brunnels are added after the route, so they are drawn above it
+    route_map.add_child(brunnel_layer)
 
 
 def create_route_map(
@@ -498,7 +720,7 @@ def create_route_map(
     _add_route_to_map(route_map, route)
 
     # Add brunnels to map
-    _add_brunnels_to_map(route_map, brunnels)
+    _add_brunnels_to_map(route_map, brunnels, args.minimal_popups)
 
     # Add legend with dynamic counts from metrics
     legend = BrunnelLegend(metrics)
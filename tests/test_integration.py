@@ -13,6 +13,18 @@ from typing import Dict, Any, List, Optional
 _CLI_RESULT_CACHE: Dict[tuple, "BrunnelsTestResult"] = {}
 
 
+@pytest.fixture(autouse=True, scope="session")
+def isolated_route_cache(tmp_path_factory):
+    """Keep the CLI's parsed-route cache out of the user's real cache directory"""
+    previous = os.environ.get("XDG_CACHE_HOME")
+    os.environ["XDG_CACHE_HOME"] = str(tmp_path_factory.mktemp("cache"))
+    yield
+    if previous is None:
+        del os.environ["XDG_CACHE_HOME"]
+    else:
+        os.environ["XDG_CACHE_HOME"] = previous
+
+
 def run_brunnels_cli(gpx_file: Path, **kwargs) -> "BrunnelsTestResult":
     """Run brunnels CLI with caching based on gpx_file and kwargs"""
     # Create cache key from gpx_file and sorted kwargs
@@ -358,6 +370,14 @@ def assert_in_range(actual: float, expected_range: str, metric_name: str):
         assert actual == expected, f"{metric_name}: expected {expected}, got {actual}"
 
 
+def extract_popups(html_content: str) -> List[str]:
+    """Extract the popup HTML of every brunnel from the map's brunnel layer"""
+    return [
+        json.loads(f'"{popup}"')
+        for popup in re.findall(r'"popup":"((?:[^"\\]|\\.)*)"', html_content)
+    ]
+
+
 class BaseRouteTest:
     """Base class for route-specific integration tests."""
 
@@ -1008,6 +1028,44 @@ class TestPaulRevereRoute(BaseRouteTest):
                 default_result.exclusion_details["misaligned"] >= 3
             ), "Expected some bearing misalignment exclusion"
 
+    def test_minimal_popups(self, gpx_file: Path):
+        """Test that --minimal-popups shortens only the popups of excluded brunnels"""
+        default_result = run_brunnels_cli(gpx_file)
+        result = run_brunnels_cli(gpx_file, minimal_popups=True)
+        assert default_result.exit_code == 0
+        assert result.exit_code == 0
+        assert default_result.html_content is not None
+        assert result.html_content is not None
+
+        popups = extract_popups(result.html_content)
+        assert len(popups) == len(extract_popups(default_result.html_content))
+
+        # The popup header is "<b>Bridge</b> (status)" or "<b>Tunnel</b> (status)"
+        excluded_statuses = (
+            "(alternative overlapping brunnel)",
+            "(not aligned with route)",
+        )
+        excluded_popups = [
+            p for p in popups if p.split("<br>", 1)[0].endswith(excluded_statuses)
+        ]
+        included_popups = [p for p in popups if p not in excluded_popups]
+        assert excluded_popups, "Expected alternative or misaligned brunnels"
+        assert included_popups, "Expected included brunnels"
+
+        # Included brunnels keep their full metadata
+        for popup in included_popups:
+            assert "<b>Tags:</b>" in popup, f"Included popup lost its tags: {popup}"
+
+        # Excluded brunnels show only their names and OSM ID
+        for popup in excluded_popups:
+            assert "<b>Tags:</b>" not in popup, f"Excluded popup has tags: {popup}"
+            assert "<b>Other:</b>" not in popup, f"Excluded popup has metadata: {popup}"
+            assert re.search(
+                r"<br><b>OSM ID:</b> [\d;]+$", popup
+            ), f"Excluded popup should end with its OSM ID: {popup}"
+
+        assert len(result.html_content) < len(default_result.html_content)
+
 
 @pytest.mark.slow
 class TestAcrossAmericaRoute(BaseRouteTest):
@@ -1248,6 +1306,41 @@ class TestChehalisRoute(BaseRouteTest):
             highway_cycleway_highlighted == 0
         ), f"highway=cycleway should not be highlighted in red, found {highway_cycleway_highlighted}"
 
+    def test_route_cache_reuse(self, gpx_file: Path, tmp_path: Path, monkeypatch):
+        """Test that a second run served from the route cache gives identical output"""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        first = _run_brunnels_cli(gpx_file)
+        second = _run_brunnels_cli(gpx_file)
+        assert first.exit_code == 0
+        assert second.exit_code == 0
+
+        # The first run parses the GPX file and fills the cache; the second reads it
+        assert "Reading GPX file" in first.stderr
+        assert "Loaded cached route" in second.stderr
+        cache_files = list((tmp_path / "brunnels" / "routes").glob("*.npz"))
+        assert len(cache_files) == 1
+
+        assert second.stdout == first.stdout
+        assert second.metrics == first.metrics
+
+        # Folium gives every map element a random hex ID, so normalize those
+        def normalize(html):
+            return re.sub(r"[0-9a-f]{32}", "ID", html)
+
+        assert first.html_content is not None
+        assert second.html_content is not None
+        assert normalize(second.html_content) == normalize(first.html_content)
+
+    def test_no_cache_option(self, gpx_file: Path, tmp_path: Path, monkeypatch):
+        """Test that --no-cache neither reads nor writes the route cache"""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+        result = _run_brunnels_cli(gpx_file, no_cache=True)
+        assert result.exit_code == 0
+        assert "Reading GPX file" in result.stderr
+        assert not (tmp_path / "brunnels").exists()
+
     def test_rails_to_trails_characteristics(
         self, gpx_file: Path, metadata: Dict[str, Any]
     ):